@@ -9,7 +9,10 @@ This script checks:
 4. Data quality and structure
 """
 
+import os
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import pandas as pd
 
@@ -44,20 +47,30 @@ def check_apple_watch_data():
     print(f"✓ Found: {xml_file} ({xml_file.stat().st_size / 1024 / 1024:.2f} MB)")
     
     try:
-        import xml.etree.ElementTree as ET
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-        records = root.findall('.//Record')
-        
-        print(f"\n✓ Health records: {len(records):,}")
-        
-        # Count by type (sample)
-        types = {}
-        for r in records[:1000]:  # Sample first 1000
-            t = r.get('type', 'unknown')
-            types[t] = types.get(t, 0) + 1
-        
-        print(f"\nSample record types:")
+        import xml.sax
+
+        # Stream the export with SAX instead of building any tree - Apple
+        # Health exports can be multiple GB and this pass only needs the
+        # type attribute of each Record.
+        class RecordCounter(xml.sax.ContentHandler):
+            def __init__(self):
+                super().__init__()
+                self.count = 0
+                self.types = Counter()
+
+            def startElement(self, name, attrs):
+                if name == 'Record':
+                    self.count += 1
+                    self.types[attrs.get('type', 'unknown')] += 1
+
+        handler = RecordCounter()
+        xml.sax.parse(str(xml_file), handler)
+        count = handler.count
+        types = handler.types
+
+        print(f"\n✓ Health records: {count:,}")
+
+        print(f"\nRecord types:")
         for t, count in list(sorted(types.items(), key=lambda x: x[1], reverse=True))[:10]:
             print(f"  - {t}: {count}")
         
@@ -83,26 +96,51 @@ def check_oura_data():
     
     print(f"✓ Found {len(csv_files)} CSV files:")
     
+    import csv as csv_mod
+    import pyarrow.csv as pacsv
+    import pyarrow.compute as pc
+
     total_records = 0
     for csv_file in csv_files:
         try:
-            df = pd.read_csv(csv_file)
-            count = len(df)
+            # Column names come from the header line and row counts from a
+            # raw newline scan - no need to parse (or type-infer) any of
+            # the non-date columns.
+            with open(csv_file, newline='') as fh:
+                columns = next(csv_mod.reader(fh), [])
+            count = fast_rowcount(csv_file)
             total_records += count
             print(f"\n  - {csv_file.name}:")
             print(f"    Records: {count:,}")
-            print(f"    Columns: {len(df.columns)}")
-            print(f"    Column names: {', '.join(df.columns.tolist()[:10])}")
-            if len(df.columns) > 10:
-                print(f"                ... and {len(df.columns) - 10} more")
-            
-            if 'date' in df.columns or 'Date' in df.columns:
-                date_col = 'date' if 'date' in df.columns else 'Date'
-                dates = pd.to_datetime(df[date_col], errors='coerce')
-                dates = dates.dropna()
-                if len(dates) > 0:
-                    print(f"    Date range: {dates.min()} to {dates.max()}")
-                    
+            print(f"    Columns: {len(columns)}")
+            print(f"    Column names: {', '.join(columns[:10])}")
+            if len(columns) > 10:
+                print(f"                ... and {len(columns) - 10} more")
+
+            if 'date' in columns or 'Date' in columns:
+                date_col = 'date' if 'date' in columns else 'Date'
+                # Parse only the date column; Arrow skips the rest entirely.
+                table = pacsv.read_csv(
+                    csv_file,
+                    read_options=pacsv.ReadOptions(block_size=1 << 20),
+                    convert_options=pacsv.ConvertOptions(include_columns=[date_col]),
+                )
+                try:
+                    dates = pc.drop_null(table.column(date_col).cast('timestamp[s]'))
+                    if len(dates) > 0:
+                        bounds = pc.min_max(dates).as_py()
+                        print(f"    Date range: {bounds['min']} to {bounds['max']}")
+                except Exception:
+                    # Arrow cast is strict; fall back to pandas with an
+                    # explicit ISO8601 format so parsing stays on the C
+                    # fast path instead of the per-element dateutil one.
+                    dates = pd.to_datetime(
+                        table.column(date_col).to_pandas(),
+                        format='ISO8601', errors='coerce', cache=True,
+                    ).dropna()
+                    if len(dates) > 0:
+                        print(f"    Date range: {dates.min()} to {dates.max()}")
+
         except Exception as e:
             print(f"  ✗ Error reading {csv_file.name}: {e}")
     
@@ -110,6 +148,42 @@ def check_oura_data():
     return True
 
 
+def iter_csvs(root):
+    """Yield paths of all CSV files under root using an os.scandir stack.
+
+    Much cheaper than Path.rglob for wide trees: one stat per entry and no
+    per-directory Path allocation.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.csv'):
+                    yield entry.path
+
+
+def fast_rowcount(path):
+    """Count data rows in a CSV by scanning raw bytes for newlines.
+
+    Avoids parsing/dtype inference entirely - a chunked bytes.count is a
+    single memchr loop in C. Returns -1 if the file cannot be read.
+    """
+    try:
+        lines = 0
+        last_chunk = b''
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                lines += chunk.count(b'\n')
+                last_chunk = chunk
+        if last_chunk and not last_chunk.endswith(b'\n'):
+            lines += 1  # final line without trailing newline
+        return max(lines - 1, 0)  # minus header
+    except OSError:
+        return -1
+
+
 def check_pmdata():
     """Check PMData dataset."""
     print("\n" + "=" * 70)
@@ -124,7 +198,7 @@ def check_pmdata():
     
     # Check structure
     participants = [d for d in pmdata_dir.iterdir() if d.is_dir() and d.name.startswith('p')]
-    csv_files = list(pmdata_dir.rglob("*.csv"))
+    csv_files = [Path(p) for p in iter_csvs(pmdata_dir)]
     
     print(f"✓ Found:")
     print(f"  - Participants: {len(participants)} (p01-p{len(participants):02d})")
@@ -136,27 +210,21 @@ def check_pmdata():
         print(f"\n  Structure (example: {p_dir.name}):")
         for subdir in sorted(p_dir.iterdir()):
             if subdir.is_dir():
-                sub_csv = list(subdir.glob("*.csv"))
+                sub_csv = [Path(p) for p in iter_csvs(subdir)]
                 print(f"    - {subdir.name}/: {len(sub_csv)} CSV files")
                 if sub_csv:
-                    # Show first file
-                    try:
-                        sample_df = pd.read_csv(sub_csv[0])
-                        print(f"      Sample: {sub_csv[0].name} ({len(sample_df)} records)")
-                    except:
-                        pass
-    
-    # Count total records
-    total_records = 0
-    sample_files = 0
-    for csv_file in csv_files[:100]:  # Sample first 100 files
-        try:
-            df = pd.read_csv(csv_file)
-            total_records += len(df)
-            sample_files += 1
-        except:
-            pass
+                    # Show first file - row count only, no parsing needed
+                    sample_count = fast_rowcount(sub_csv[0])
+                    if sample_count >= 0:
+                        print(f"      Sample: {sub_csv[0].name} ({sample_count} records)")
     
+    # Count total records via raw newline counting - no CSV parsing needed.
+    # The per-file counts share no state, so fan out across cores.
+    with ProcessPoolExecutor() as executor:
+        counts = list(executor.map(fast_rowcount, csv_files[:100], chunksize=8))  # Sample first 100 files
+    total_records = sum(c for c in counts if c >= 0)
+    sample_files = sum(1 for c in counts if c >= 0)
+
     if sample_files > 0:
         avg_per_file = total_records / sample_files
         estimated_total = avg_per_file * len(csv_files)
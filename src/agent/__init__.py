@@ -11,12 +11,14 @@ This module implements a tool-using AI agent that:
 from .coach_agent import CoachAgent
 from .tools import AgentTools
 from .safety import SafetyGuardrails
+from .safety_batch import check_states_batch
 from .state import DailyState
 
 __all__ = [
     'CoachAgent',
     'AgentTools',
     'SafetyGuardrails',
+    'check_states_batch',
     'DailyState',
 ]
 
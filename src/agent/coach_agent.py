@@ -9,14 +9,46 @@ This agent uses LLM with tool calling to:
 """
 
 from typing import Dict, List, Optional, Any
-import json
+import asyncio
+import hashlib
 import os
+
+import cachetools
+import orjson
 from .state import DailyState, DailyStateBuilder
 from .safety import SafetyGuardrails, SafetyCheckResult
-from .tools import AgentTools
+from .tools import AgentTools, set_turn_timestamp
 from .llm_client import LLMClient
 
 
+# Built once at import - the prompt is static, so there is no reason to
+# rebuild the string for every agent instance.
+SYSTEM_PROMPT = """You are an AI Fitness Coach Agent that helps users optimize their training plans.
+
+Your role:
+1. Explain training plan recommendations in natural language
+2. Collect user feedback (RPE, mood, stress, pain)
+3. Trigger appropriate actions (plan adjustments, recovery, summaries)
+4. Provide emotional support and motivation when appropriate
+
+IMPORTANT BOUNDARIES:
+- You are NOT a medical professional. Never provide medical advice or diagnoses.
+- If you detect dangerous signals (chest pain, dizziness, severe discomfort, abnormal heart rate),
+  immediately escalate to safety alert and recommend consulting a healthcare professional.
+- Focus on fitness coaching, not mental health therapy (though you can provide encouragement).
+- Always respect user preferences and injury history.
+
+Available tools:
+- adjust_plan: Adjust training plan intensity/volume or schedule rest day
+- explain_plan: Explain why a plan was recommended
+- mood_checkin: Collect mood and stress feedback
+- set_micro_goal: Set small daily goals for adherence
+- log_event: Log events for system learning
+- request_more_info: Ask user for missing information
+
+Be conversational, supportive, and data-driven. Use the user's body state data to inform your recommendations."""
+
+
 class CoachAgent:
     """
     AI Coach Agent that provides personalized coaching through LLM + tools.
@@ -48,60 +80,63 @@ class CoachAgent:
         self.state_builder = DailyStateBuilder()
         self.safety = SafetyGuardrails()
         self.tools = AgentTools(kafka_producer, plan_service)
-        
-        # System prompt for the agent
-        self.system_prompt = self._get_system_prompt()
-    
-    def _get_system_prompt(self) -> str:
-        """Get system prompt for the LLM."""
-        return """You are an AI Fitness Coach Agent that helps users optimize their training plans.
 
-Your role:
-1. Explain training plan recommendations in natural language
-2. Collect user feedback (RPE, mood, stress, pain)
-3. Trigger appropriate actions (plan adjustments, recovery, summaries)
-4. Provide emotional support and motivation when appropriate
+        # Tool dispatch table - a single dict lookup instead of an
+        # if/elif chain per tool call. Each handler takes
+        # (user_id, plan, llm-provided kwargs).
+        self._tool_dispatch = {
+            'adjust_plan': lambda user_id, plan, kwargs:
+                self.tools.adjust_plan(user_id=user_id, **kwargs),
+            'explain_plan': lambda user_id, plan, kwargs:
+                self.tools.explain_plan(plan_id=plan['plan_id'], **kwargs),
+            'mood_checkin': lambda user_id, plan, kwargs:
+                self.tools.mood_checkin(user_id=user_id, **kwargs),
+            'set_micro_goal': lambda user_id, plan, kwargs:
+                self.tools.set_micro_goal(user_id=user_id, **kwargs),
+            'log_event': lambda user_id, plan, kwargs:
+                self.tools.log_event(**kwargs),
+        }
 
-IMPORTANT BOUNDARIES:
-- You are NOT a medical professional. Never provide medical advice or diagnoses.
-- If you detect dangerous signals (chest pain, dizziness, severe discomfort, abnormal heart rate), 
-  immediately escalate to safety alert and recommend consulting a healthcare professional.
-- Focus on fitness coaching, not mental health therapy (though you can provide encouragement).
-- Always respect user preferences and injury history.
+        # Daily-message cache: states and plans are deterministic snapshots
+        # that collide heavily across similar-recovery days, so a hit skips
+        # the entire LLM round-trip. TTL keeps entries from outliving the day.
+        self._message_cache = cachetools.TTLCache(maxsize=10_000, ttl=3600)
 
-Available tools:
-- adjust_plan: Adjust training plan intensity/volume or schedule rest day
-- explain_plan: Explain why a plan was recommended
-- mood_checkin: Collect mood and stress feedback
-- set_micro_goal: Set small daily goals for adherence
-- log_event: Log events for system learning
-- request_more_info: Ask user for missing information
+        # System prompt for the agent
+        self.system_prompt = SYSTEM_PROMPT
 
-Be conversational, supportive, and data-driven. Use the user's body state data to inform your recommendations."""
+    def _get_system_prompt(self) -> str:
+        """Get system prompt for the LLM."""
+        return SYSTEM_PROMPT
     
-    def process_daily_coaching(self, user_id: str, user_message: Optional[str] = None) -> Dict:
+    async def process_daily_coaching(self, user_id: str, user_message: Optional[str] = None) -> Dict:
         """
         Process daily coaching interaction.
-        
+
         Args:
             user_id: User identifier
             user_message: Optional user message
-        
+
         Returns:
             Coaching response dictionary
         """
-        # Build daily state
+        # One timestamp per turn - every tool payload below reuses it
+        set_turn_timestamp()
+
+        # Build daily state, then overlap the two independent I/O calls:
+        # the feature-store update and the recommendation fetch both only
+        # need the initial state, so their latencies hide each other.
         state = self.state_builder.build_state(user_id)
-        state = self.state_builder.update_from_feature_store(state)
-        
+        state, recommended_plan = await asyncio.gather(
+            asyncio.to_thread(self.state_builder.update_from_feature_store, state),
+            asyncio.to_thread(self._get_recommended_plan, user_id, state),
+        )
+
         # Safety check
         safety_result = self.safety.check_state(state)
         if not safety_result.is_safe:
             return self._handle_safety_issue(state, safety_result)
-        
-        # Get recommended plan (from external recommendation engine)
-        recommended_plan = self._get_recommended_plan(user_id, state)
-        
+
         # Check plan safety
         plan_safety = self.safety.check_plan_safety(recommended_plan, state)
         if not plan_safety.is_safe:
@@ -118,9 +153,13 @@ Be conversational, supportive, and data-driven. Use the user's body state data t
         else:
             # Daily proactive message
             response = self._generate_daily_message(user_id, state, recommended_plan)
-        
+
         return response
-    
+
+    def process_daily_coaching_sync(self, user_id: str, user_message: Optional[str] = None) -> Dict:
+        """Synchronous shim around process_daily_coaching for legacy callers."""
+        return asyncio.run(self.process_daily_coaching(user_id, user_message))
+
     def _get_recommended_plan(self, user_id: str, state: DailyState) -> Dict:
         """
         Get recommended plan from recommendation engine.
@@ -141,18 +180,16 @@ Be conversational, supportive, and data-driven. Use the user's body state data t
     
     def _adjust_plan_for_safety(self, plan: Dict, safety_result: SafetyCheckResult) -> Dict:
         """Adjust plan based on safety check result."""
-        adjusted = plan.copy()
-        
-        if safety_result.recommended_action == 'rest_day_or_light_activity':
-            adjusted['intensity'] = 'low'
-            adjusted['volume'] = 'low'
-        elif safety_result.recommended_action == 'reduce_intensity':
-            if adjusted['intensity'] == 'high':
-                adjusted['intensity'] = 'moderate'
-            elif adjusted['intensity'] == 'moderate':
-                adjusted['intensity'] = 'low'
-        
-        return adjusted
+        action = safety_result.recommended_action
+
+        if action == 'rest_day_or_light_activity':
+            return {**plan, 'intensity': 'low', 'volume': 'low'}
+        if action == 'reduce_intensity':
+            stepped_down = {'high': 'moderate', 'moderate': 'low'}
+            intensity = stepped_down.get(plan['intensity'], plan['intensity'])
+            return {**plan, 'intensity': intensity}
+
+        return dict(plan)
     
     def _generate_daily_message(self, user_id: str, state: DailyState, 
                                 plan: Dict) -> Dict:
@@ -176,11 +213,16 @@ Be conversational, supportive, and data-driven. Use the user's body state data t
         
         # If using LLM
         if self.llm_client:
+            cache_key = self._message_cache_key(context['state_summary'], plan)
+            cached = self._message_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             messages = [
                 {'role': 'system', 'content': self.system_prompt},
                 {'role': 'user', 'content': self._build_daily_prompt(context)},
             ]
-            
+
             # Call LLM with tool calling
             response = self.llm_client.chat.completions.create(
                 model="gpt-4",  # or your preferred model
@@ -188,12 +230,20 @@ Be conversational, supportive, and data-driven. Use the user's body state data t
                 tools=self.tools.get_tool_definitions(),
                 tool_choice="auto",
             )
-            
-            return self._process_llm_response(response, user_id, state, plan)
+
+            result = self._process_llm_response(response, user_id, state, plan)
+            self._message_cache[cache_key] = result
+            return result
         else:
             # Fallback: rule-based response
             return self._generate_rule_based_message(state, plan)
     
+    @staticmethod
+    def _message_cache_key(state_summary: str, plan: Dict) -> bytes:
+        """Hash the state summary and plan into a compact cache key."""
+        blob = state_summary.encode() + b'|' + orjson.dumps(plan, option=orjson.OPT_SORT_KEYS)
+        return hashlib.blake2b(blob, digest_size=16).digest()
+
     def _generate_conversational_response(self, user_id: str, user_message: str,
                                          state: DailyState, plan: Dict) -> Dict:
         """Generate conversational response to user message."""
@@ -227,23 +277,12 @@ Be conversational, supportive, and data-driven. Use the user's body state data t
         if message.tool_calls:
             for tool_call in message.tool_calls:
                 function_name = tool_call.function.name
-                function_args = json.loads(tool_call.function.arguments)
-                
+                function_args = orjson.loads(tool_call.function.arguments)
+
                 # Call appropriate tool
-                if function_name == 'adjust_plan':
-                    result = self.tools.adjust_plan(user_id=user_id, **function_args)
-                    tools_called.append({'tool': function_name, 'result': result})
-                elif function_name == 'explain_plan':
-                    result = self.tools.explain_plan(plan_id=plan['plan_id'], **function_args)
-                    tools_called.append({'tool': function_name, 'result': result})
-                elif function_name == 'mood_checkin':
-                    result = self.tools.mood_checkin(user_id=user_id, **function_args)
-                    tools_called.append({'tool': function_name, 'result': result})
-                elif function_name == 'set_micro_goal':
-                    result = self.tools.set_micro_goal(user_id=user_id, **function_args)
-                    tools_called.append({'tool': function_name, 'result': result})
-                elif function_name == 'log_event':
-                    result = self.tools.log_event(**function_args)
+                handler = self._tool_dispatch.get(function_name)
+                if handler:
+                    result = handler(user_id, plan, function_args)
                     tools_called.append({'tool': function_name, 'result': result})
         
         return {
@@ -257,7 +296,7 @@ Be conversational, supportive, and data-driven. Use the user's body state data t
         return f"""Generate a daily coaching message for the user.
 
 Current body state: {context['state_summary']}
-Recommended plan: {json.dumps(context['plan'], indent=2)}
+Recommended plan: {orjson.dumps(context['plan'], option=orjson.OPT_INDENT_2).decode()}
 
 Provide:
 1. A brief explanation of why this plan fits their current state
@@ -267,27 +306,39 @@ Provide:
 
 Use tools if you need to adjust the plan or set goals."""
     
+    # Preformatted fragments for the rule-based fallback path, keyed on the
+    # readiness/motivation buckets - one f-string per message instead of a
+    # list-append-join pipeline.
+    _READINESS_MSG = {
+        True: "Your readiness score is lower today, so I've adjusted your plan to be lighter.",
+        False: "Based on your current body state, here's your recommended training plan.",
+    }
+    _MOTIVATION_MSG = {
+        'high': " Great to see your high motivation! Let's make the most of it.",
+        'low': " I understand if you're not feeling super motivated today. Even a light session helps.",
+        'mid': "",
+    }
+
     def _generate_rule_based_message(self, state: DailyState, plan: Dict) -> Dict:
         """Generate rule-based message (fallback when LLM not available)."""
-        message_parts = []
-        
-        # Explain plan
-        if state.readiness_score and state.readiness_score < 60:
-            message_parts.append("Your readiness score is lower today, so I've adjusted your plan to be lighter.")
+        low_readiness = bool(state.readiness_score and state.readiness_score < 60)
+
+        motivation = state.motivation_level
+        if motivation and motivation >= 7:
+            mood = 'high'
+        elif motivation and motivation <= 4:
+            mood = 'low'
         else:
-            message_parts.append("Based on your current body state, here's your recommended training plan.")
-        
-        # Add plan details
-        message_parts.append(f"Today's plan: {plan.get('intensity', 'moderate')} intensity training.")
-        
-        # Motivation
-        if state.motivation_level and state.motivation_level >= 7:
-            message_parts.append("Great to see your high motivation! Let's make the most of it.")
-        elif state.motivation_level and state.motivation_level <= 4:
-            message_parts.append("I understand if you're not feeling super motivated today. Even a light session helps.")
-        
+            mood = 'mid'
+
+        message = (
+            f"{self._READINESS_MSG[low_readiness]} "
+            f"Today's plan: {plan.get('intensity', 'moderate')} intensity training."
+            f"{self._MOTIVATION_MSG[mood]}"
+        )
+
         return {
-            'message': " ".join(message_parts),
+            'message': message,
             'tools_called': [],
             'plan': plan,
         }
@@ -5,12 +5,38 @@ This module implements safety checks to prevent dangerous recommendations
 and ensure user safety.
 """
 
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
+import numpy as np
 from .state import DailyState
 
+try:
+    import ahocorasick  # pyahocorasick - optional, speeds up injury matching
+except ImportError:
+    ahocorasick = None
 
-@dataclass
+
+@lru_cache(maxsize=128)
+def _injury_matcher(injuries: Tuple[str, ...]):
+    """Build a matcher for lowercase injury terms.
+
+    With pyahocorasick available this compiles all terms into one automaton
+    so each exercise name is scanned in a single pass; otherwise it falls
+    back to a substring scan over the (pre-lowered) terms. Cached per
+    injury-history tuple since histories rarely change between checks.
+    """
+    lowered = tuple(inj.lower() for inj in injuries)
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for term in lowered:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+        return lambda name: next(automaton.iter(name), None) is not None
+    return lambda name: any(term in name for term in lowered)
+
+
+@dataclass(slots=True, frozen=True)
 class SafetyCheckResult:
     """Result of a safety check."""
     is_safe: bool
@@ -47,32 +73,38 @@ class SafetyGuardrails:
         Returns:
             SafetyCheckResult
         """
-        checks = [
-            self._check_physiological_signals(state),
-            self._check_overtraining_risk(state),
-            self._check_fatigue_level(state),
-            self._check_sleep_recovery(state),
-            self._check_injury_risks(state),
-        ]
-        
-        # Find highest risk level
-        critical_checks = [c for c in checks if c.risk_level == "critical"]
-        high_checks = [c for c in checks if c.risk_level == "high"]
-        medium_checks = [c for c in checks if c.risk_level == "medium"]
-        
-        if critical_checks:
-            return critical_checks[0]
-        elif high_checks:
-            return high_checks[0]
-        elif medium_checks:
-            return medium_checks[0]
-        else:
-            return SafetyCheckResult(
-                is_safe=True,
-                risk_level="low",
-                message="All safety checks passed",
-                recommended_action="proceed_with_plan"
-            )
+        checks = (
+            self._check_physiological_signals,
+            self._check_overtraining_risk,
+            self._check_fatigue_level,
+            self._check_sleep_recovery,
+            self._check_injury_risks,
+        )
+
+        # Run checks lazily, short-circuiting on the first critical result.
+        # Otherwise keep the first high/medium result seen, so the returned
+        # check is the same one the old run-everything pass would pick.
+        first_high = None
+        first_medium = None
+        for check in checks:
+            result = check(state)
+            if result.risk_level == "critical":
+                return result
+            if result.risk_level == "high" and first_high is None:
+                first_high = result
+            elif result.risk_level == "medium" and first_medium is None:
+                first_medium = result
+
+        if first_high:
+            return first_high
+        if first_medium:
+            return first_medium
+        return SafetyCheckResult(
+            is_safe=True,
+            risk_level="low",
+            message="All safety checks passed",
+            recommended_action="proceed_with_plan"
+        )
     
     def _check_physiological_signals(self, state: DailyState) -> SafetyCheckResult:
         """Check for abnormal physiological signals."""
@@ -211,17 +243,16 @@ class SafetyGuardrails:
         
         # Check for injury-related exercises
         if state.injury_history:
-            plan_exercises = plan.get('exercises', [])
-            for exercise in plan_exercises:
+            matches_injury = _injury_matcher(tuple(state.injury_history))
+            for exercise in plan.get('exercises', []):
                 exercise_name = exercise.get('name', '').lower()
-                for injury in state.injury_history:
-                    if injury.lower() in exercise_name:
-                        return SafetyCheckResult(
-                            is_safe=False,
-                            risk_level="critical",
-                            message=f"Plan includes exercise that may aggravate injury history: {exercise_name}",
-                            recommended_action="modify_plan"
-                        )
+                if matches_injury(exercise_name):
+                    return SafetyCheckResult(
+                        is_safe=False,
+                        risk_level="critical",
+                        message=f"Plan includes exercise that may aggravate injury history: {exercise_name}",
+                        recommended_action="modify_plan"
+                    )
         
         return SafetyCheckResult(
             is_safe=True,
@@ -245,7 +276,7 @@ class SafetyGuardrails:
             'type': 'safety_alert',
             'severity': 'critical',
             'user_id': state.user_id,
-            'timestamp': state.date,
+            'timestamp': np.datetime_as_string(state.date),
             'reason': reason,
             'recommended_action': 'stop_training_and_consult_professional',
             'message': (
@@ -0,0 +1,107 @@
+"""
+Batch Safety Scoring
+
+Vectorized counterpart of SafetyGuardrails.check_state for scoring many
+users' daily states at once (e.g. an overnight recommendation sweep).
+The per-user path in safety.py stays authoritative for single states;
+this module packs the numeric fields into a float32 array and scores
+them in one kernel pass.
+"""
+
+from typing import List
+
+import numpy as np
+
+from .safety import SafetyGuardrails
+from .state import DailyState
+
+try:
+    from numba import njit, prange  # Optional: JIT-compiles the scoring kernel
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# Risk codes returned by check_states_batch
+RISK_LOW = 0
+RISK_MEDIUM = 1
+RISK_HIGH = 2
+RISK_CRITICAL = 3
+
+# Thresholds, shared with the scalar checks (module-level floats so the
+# JIT kernel can treat them as compile-time constants)
+_MAX_RESTING_HR = float(SafetyGuardrails.MAX_RESTING_HR)
+_MIN_HRV = float(SafetyGuardrails.MIN_HRV)
+_MIN_SLEEP_HOURS = float(SafetyGuardrails.MIN_SLEEP_HOURS)
+_MAX_FATIGUE = float(SafetyGuardrails.MAX_FATIGUE_FOR_TRAINING)
+_MAX_FREQUENCY = float(SafetyGuardrails.MAX_CONSECUTIVE_HIGH_INTENSITY)
+
+# Column order of the packed state array
+_FIELDS = (
+    'resting_heart_rate',
+    'hrv',
+    'sleep_duration_hours',
+    'fatigue_level',
+    'readiness_score',
+    'muscle_soreness',
+    'overtraining_risk',
+    'training_frequency_last_week',
+)
+
+
+def pack_states(states: List[DailyState]) -> np.ndarray:
+    """Pack the numeric safety fields of each state into an (N, 8) array.
+
+    Missing values become NaN, which every threshold comparison treats as
+    "no signal" - matching the `if state.x and ...` guards in safety.py.
+    """
+    arr = np.empty((len(states), len(_FIELDS)), dtype=np.float32)
+    for i, state in enumerate(states):
+        for j, field in enumerate(_FIELDS):
+            value = getattr(state, field)
+            arr[i, j] = np.nan if value is None else float(value)
+    return arr
+
+
+if HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _score_kernel(arr):
+        n = arr.shape[0]
+        out = np.zeros(n, dtype=np.int8)
+        for i in prange(n):
+            if arr[i, 6] > 0.5:
+                out[i] = RISK_CRITICAL
+            elif (arr[i, 0] > _MAX_RESTING_HR or arr[i, 1] < _MIN_HRV
+                  or arr[i, 3] >= _MAX_FATIGUE or arr[i, 5] >= 8.0
+                  or arr[i, 7] >= _MAX_FREQUENCY):
+                out[i] = RISK_HIGH
+            elif arr[i, 2] < _MIN_SLEEP_HOURS or arr[i, 4] < 50.0:
+                out[i] = RISK_MEDIUM
+        return out
+else:
+    def _score_kernel(arr):
+        # NumPy fallback: same thresholds, whole-array masks. NaN compares
+        # False everywhere, so missing fields never trigger a flag.
+        out = np.zeros(arr.shape[0], dtype=np.int8)
+        medium = (arr[:, 2] < _MIN_SLEEP_HOURS) | (arr[:, 4] < 50.0)
+        high = ((arr[:, 0] > _MAX_RESTING_HR) | (arr[:, 1] < _MIN_HRV)
+                | (arr[:, 3] >= _MAX_FATIGUE) | (arr[:, 5] >= 8.0)
+                | (arr[:, 7] >= _MAX_FREQUENCY))
+        critical = arr[:, 6] > 0.5
+        out[medium] = RISK_MEDIUM
+        out[high] = RISK_HIGH
+        out[critical] = RISK_CRITICAL
+        return out
+
+
+def check_states_batch(states: List[DailyState]) -> np.ndarray:
+    """Score a batch of daily states, returning an (N,) risk-code array.
+
+    Thresholds mirror SafetyGuardrails.check_state: overtraining risk is
+    critical; elevated resting HR, low HRV, high fatigue, high soreness,
+    or high training frequency are high; short sleep or low readiness are
+    medium. With numba installed the kernel is JIT-compiled and parallel;
+    otherwise a vectorized NumPy fallback is used.
+    """
+    if not states:
+        return np.zeros(0, dtype=np.int8)
+    return _score_kernel(pack_states(states))
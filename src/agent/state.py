@@ -5,13 +5,19 @@ This module handles the construction of daily state from feature store
 and real-time data streams.
 """
 
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Optional, Dict, List
-import pandas as pd
+from typing import Optional, Dict, List, Union, TYPE_CHECKING
+import lz4.frame
+import numpy as np
+import orjson
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-@dataclass
+
+@dataclass(slots=True)
 class DailyState:
     """
     Daily state representation for the AI Coach Agent.
@@ -20,8 +26,8 @@ class DailyState:
     and user feedback - safe for LLM consumption.
     """
     user_id: str
-    date: str
-    
+    date: np.datetime64  # day precision; 8-byte POD instead of a str/datetime
+
     # Physiological metrics
     hrv: Optional[float] = None
     resting_heart_rate: Optional[float] = None
@@ -51,18 +57,18 @@ class DailyState:
     current_phase: Optional[str] = None  # "bulking", "cutting", "maintenance"
     
     # Safety flags
-    injury_history: List[str] = None
+    injury_history: List[str] = field(default_factory=list)
     overtraining_risk: bool = False
-    
+
     def __post_init__(self):
-        if self.injury_history is None:
-            self.injury_history = []
+        if not isinstance(self.date, np.datetime64):
+            self.date = np.datetime64(self.date, 'D')
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for LLM consumption."""
         return {
             'user_id': self.user_id,
-            'date': self.date,
+            'date': str(self.date),  # keep the wire format JSON-safe
             'physiological': {
                 'hrv': self.hrv,
                 'resting_heart_rate': self.resting_heart_rate,
@@ -97,84 +103,218 @@ class DailyState:
             },
         }
     
+    def to_dict_flat(self) -> Dict:
+        """
+        Single-level dict of the non-None fields.
+
+        Freshly built states are mostly None until backfilled, so this
+        specialization allocates one small dict instead of the full
+        7-group structure to_dict() builds. Prefer it for prompt building
+        unless the caller needs the grouped layout.
+        """
+        flat = {
+            name: value
+            for name in _STATE_FIELD_NAMES
+            if (value := getattr(self, name)) is not None
+        }
+        flat['date'] = str(self.date)  # keep the wire format JSON-safe
+        return flat
+
+    def to_json_bytes(self) -> bytes:
+        """
+        Serialize directly to JSON bytes for LLM/transport consumption.
+
+        orjson walks the dataclass natively, skipping the intermediate
+        nested dict that to_dict() builds; default=str covers the
+        np.datetime64 date.
+        """
+        return orjson.dumps(self, default=str)
+
+    @classmethod
+    def from_row(cls, row) -> "DailyState":
+        """
+        Build a DailyState from one row of a bulk feature frame.
+
+        Accepts a pandas Series or dict keyed by field name; NaN values
+        from DataFrame columns are normalized back to None.
+        """
+        kwargs = {}
+        for name in _STATE_FIELD_NAMES:
+            value = row.get(name)
+            if isinstance(value, float) and np.isnan(value):
+                value = None
+            kwargs[name] = value
+        if kwargs.get('injury_history') is None:
+            kwargs['injury_history'] = []
+        if kwargs.get('overtraining_risk') is None:
+            kwargs['overtraining_risk'] = False
+        return cls(**kwargs)
+
     def to_natural_language(self) -> str:
         """Convert to natural language summary for LLM."""
-        parts = []
-        
-        if self.readiness_score:
-            parts.append(f"Readiness score: {self.readiness_score}/100")
-        if self.sleep_quality_score:
-            parts.append(f"Sleep quality: {self.sleep_quality_score}/100")
-        if self.resting_heart_rate:
-            parts.append(f"Resting heart rate: {self.resting_heart_rate} bpm")
-        if self.days_since_last_training is not None:
-            parts.append(f"Last trained {self.days_since_last_training} days ago")
-        if self.fatigue_level:
-            parts.append(f"Fatigue level: {self.fatigue_level}/10")
-        if self.motivation_level:
-            parts.append(f"Motivation level: {self.motivation_level}/10")
-        if self.mood_score:
-            parts.append(f"Mood score: {self.mood_score}/5")
-        
-        return ". ".join(parts) if parts else "No data available"
+        summary = ". ".join(
+            template.format(value)
+            for attr, template, allow_zero in _NL_FIELDS
+            if (value := getattr(self, attr)) or (allow_zero and value is not None)
+        )
+        return summary if summary else "No data available"
+
+
+# Field-name tuple used by the bulk (struct-of-arrays) construction path
+_STATE_FIELD_NAMES = tuple(f.name for f in fields(DailyState))
+
+# (attribute, sentence template, include-zero) rows driving
+# to_natural_language - data-driven instead of one branch per field.
+# days_since_last_training is the only field where 0 is meaningful.
+_NL_FIELDS = (
+    ('readiness_score', 'Readiness score: {}/100', False),
+    ('sleep_quality_score', 'Sleep quality: {}/100', False),
+    ('resting_heart_rate', 'Resting heart rate: {} bpm', False),
+    ('days_since_last_training', 'Last trained {} days ago', True),
+    ('fatigue_level', 'Fatigue level: {}/10', False),
+    ('motivation_level', 'Motivation level: {}/10', False),
+    ('mood_score', 'Mood score: {}/5', False),
+)
 
 
 class DailyStateBuilder:
     """Builds DailyState from feature store and data sources."""
     
-    def __init__(self, feature_store_client=None):
+    def __init__(self, feature_store_client=None, redis_client=None):
         """
         Initialize state builder.
-        
+
         Args:
             feature_store_client: Feast feature store client (optional)
+            redis_client: Redis client for precomputed state blobs (optional)
         """
         self.feature_store = feature_store_client
+        self.redis = redis_client
     
-    def build_state(self, user_id: str, date: Optional[str] = None) -> DailyState:
+    def build_state(self, user_id: str,
+                    date: Optional[Union[str, np.datetime64]] = None) -> DailyState:
         """
         Build daily state for a user.
-        
+
         Args:
             user_id: User identifier
-            date: Date in YYYY-MM-DD format (defaults to today)
-        
+            date: Date as YYYY-MM-DD string or np.datetime64 (defaults to today)
+
         Returns:
             DailyState object
         """
+        frame = self.build_states_bulk([user_id], date)
+        return DailyState.from_row(frame.iloc[0])
+
+    def build_states_bulk(self, user_ids: List[str],
+                          date: Optional[Union[str, np.datetime64]] = None) -> "pd.DataFrame":
+        """
+        Build daily-state rows for a cohort of users in one pass.
+
+        Issues a single feature-store read for all entity keys and returns
+        a struct-of-arrays DataFrame whose columns match DailyState fields.
+        Materialize individual states lazily via DailyState.from_row.
+
+        Args:
+            user_ids: User identifiers
+            date: Date for all rows (defaults to today)
+
+        Returns:
+            DataFrame with one row per user
+        """
         if date is None:
-            date = datetime.now().strftime('%Y-%m-%d')
-        
-        # In production, fetch from feature store
-        # For now, return a template state
-        state = DailyState(
-            user_id=user_id,
-            date=date,
-            # These would be fetched from feature store in production
-            hrv=None,
-            resting_heart_rate=None,
-            sleep_duration_hours=None,
-            sleep_quality_score=None,
-            readiness_score=None,
-            steps=None,
-            active_calories=None,
-            days_since_last_training=None,
-            training_frequency_last_week=None,
-            avg_rpe_last_week=None,
-            completion_rate_last_week=None,
-            fatigue_level=None,
-            motivation_level=None,
-            muscle_soreness=None,
-            stress_level=None,
-            mood_score=None,
-            primary_goal=None,
-            current_phase=None,
-            injury_history=[],
-            overtraining_risk=False,
-        )
-        
-        return state
+            date = np.datetime64(datetime.now(), 'D')
+        else:
+            date = np.datetime64(date, 'D')
+
+        # In production, fetch all users in one get_online_features call:
+        # features = self.feature_store.get_online_features(
+        #     entity_rows=[{'user_id': u} for u in user_ids], ...)
+        # For now, return template rows
+        # Deferred import: pandas costs hundreds of ms at interpreter start
+        # and the agent cold-start path never reaches this bulk builder
+        import pandas as pd
+
+        frame = pd.DataFrame({'user_id': user_ids})
+        frame['date'] = date
+        for name in _STATE_FIELD_NAMES:
+            if name not in frame.columns:
+                frame[name] = None
+
+        return frame
     
+    @staticmethod
+    def _blob_key(user_id: str, date) -> str:
+        """Redis key for a precomputed daily-state blob."""
+        return f"fs:daily:{user_id}:{date}"
+
+    def _state_blob(self, state: DailyState) -> bytes:
+        """Serialize a state to one lz4-compressed orjson blob."""
+        flat = {name: getattr(state, name) for name in _STATE_FIELD_NAMES}
+        return lz4.frame.compress(orjson.dumps(flat, default=str))
+
+    def materialize(self, user_id: str,
+                    date: Optional[Union[str, np.datetime64]] = None) -> DailyState:
+        """
+        Precompute a user's daily state and store it as a single blob.
+
+        Run at materialization time (e.g. nightly) so that serving does one
+        key-value read instead of per-feature-view lookups.
+
+        Returns:
+            The materialized DailyState
+        """
+        state = self.build_state(user_id, date)
+        state = self.update_from_feature_store(state)
+        if self.redis is not None:
+            self.redis.set(self._blob_key(user_id, state.date), self._state_blob(state))
+        return state
+
+    def build_state_fast(self, user_id: str,
+                         date: Optional[Union[str, np.datetime64]] = None) -> DailyState:
+        """
+        Build daily state from the precomputed blob cache.
+
+        One Redis GET + decompress + orjson.loads rebuilds the full state;
+        falls back to the regular build path on a cache miss or when no
+        Redis client is configured.
+        """
+        if self.redis is not None:
+            if date is None:
+                date = np.datetime64(datetime.now(), 'D')
+            blob = self.redis.get(self._blob_key(user_id, date))
+            if blob is not None:
+                return DailyState.from_row(orjson.loads(lz4.frame.decompress(blob)))
+        return self.build_state(user_id, date)
+
+    def build_states_bulk_fast(self, user_ids: List[str],
+                               date: Optional[Union[str, np.datetime64]] = None) -> Dict[str, DailyState]:
+        """
+        Fetch many users' precomputed states with a single Redis MGET.
+
+        One round-trip replaces N GETs; deserialization fans out across a
+        thread pool since orjson releases the GIL. Users without a cached
+        blob fall back to the regular build path.
+
+        Returns:
+            Dict mapping user_id to DailyState
+        """
+        if date is None:
+            date = np.datetime64(datetime.now(), 'D')
+
+        blobs = [None] * len(user_ids)
+        if self.redis is not None and user_ids:
+            blobs = self.redis.mget([self._blob_key(u, date) for u in user_ids])
+
+        def rehydrate(item):
+            user_id, blob = item
+            if blob is None:
+                return user_id, self.build_state(user_id, date)
+            return user_id, DailyState.from_row(orjson.loads(lz4.frame.decompress(blob)))
+
+        with ThreadPoolExecutor() as executor:
+            return dict(executor.map(rehydrate, zip(user_ids, blobs)))
+
     def update_from_feature_store(self, state: DailyState) -> DailyState:
         """
         Update state from feature store.
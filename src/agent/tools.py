@@ -5,8 +5,252 @@ These tools enable the agent to take actions in the system.
 """
 
 from typing import Dict, List, Optional, Any
+from contextvars import ContextVar
 from datetime import datetime
-import json
+from functools import lru_cache
+from statistics import fmean
+from types import MappingProxyType
+import asyncio
+import threading
+
+import msgpack
+import orjson
+
+# Timestamp pinned for the duration of one agent turn so the several tool
+# and event payloads built per interaction share a single datetime.now()
+# + isoformat() instead of recomputing it each time.
+_current_ts: ContextVar[Optional[str]] = ContextVar('agent_turn_ts', default=None)
+
+
+def set_turn_timestamp(ts: Optional[str] = None) -> str:
+    """Pin the timestamp used by tool payloads for the current agent turn."""
+    if ts is None:
+        ts = datetime.now().isoformat()
+    _current_ts.set(ts)
+    return ts
+
+
+def _now_iso() -> str:
+    """Current turn's pinned timestamp, or a fresh one outside a turn."""
+    ts = _current_ts.get()
+    return ts if ts is not None else datetime.now().isoformat()
+
+
+# Event-type -> Kafka topic routing, built once at module scope - the
+# lookup sits on the per-event critical path.
+_TOPIC_MAPPING = {
+    'training.plan.adjusted': 'training.plan.served',
+    'agent.user.feedback': 'training.user.feedback',
+    'agent.daily_summary': 'agent.conversation.events',
+    'agent.micro_goal.set': 'agent.conversation.events',
+}
+_DEFAULT_TOPIC = 'agent.conversation.events'
+
+# Topics that OnlineLearningLoop also produces to, as orjson JSON. They
+# always stay JSON here so each topic carries exactly one wire format
+# regardless of which producer wrote a given message.
+_SHARED_JSON_TOPICS = frozenset({
+    'training.plan.served',
+    'training.user.feedback',
+})
+
+
+@lru_cache(maxsize=16)
+def _breathing_instructions(duration_seconds: int) -> str:
+    """Instruction text per duration - only a handful of durations occur,
+    so the formatted block is built once each."""
+    return (
+        f"Take {duration_seconds} seconds for this breathing exercise:\n"
+        "1. Inhale slowly for 4 counts\n"
+        "2. Hold for 4 counts\n"
+        "3. Exhale slowly for 4 counts\n"
+        "4. Repeat until time is up"
+    )
+
+
+@lru_cache(maxsize=32)
+def _topic_for(event_type: str) -> str:
+    """Resolve the Kafka topic for an event type.
+
+    The lru_cache turns repeat lookups for the handful of live event
+    types into a single hash probe on the cache dict.
+    """
+    return _TOPIC_MAPPING.get(event_type, _DEFAULT_TOPIC)
+
+# Static message/routine templates, frozen at module scope so the hot tool
+# methods do a lookup instead of rebuilding literal dicts per call.
+_MOTIVATIONAL_MESSAGES = MappingProxyType({
+    'short': "You've got this! 💪",
+    'long': "Remember, progress isn't always linear. Every session counts, even the tough ones. You're building resilience along with strength.",
+    'humorous': "Time to turn those muscles into 'mussels' - strong and ready! 🦪",
+    'rational': "Based on your data, you're in a good position to train today. Let's optimize this session.",
+    'balanced': "You've been consistent with your training. Today is another opportunity to move forward, even if it's just a small step.",
+})
+
+_WARMUP_TEMPLATE = MappingProxyType({
+    'duration_minutes': 10,
+    'exercises': (
+        {'name': 'Light cardio', 'duration': '5 min'},
+        {'name': 'Dynamic stretching', 'duration': '5 min'},
+    ),
+})
+
+_COOLDOWN_TEMPLATE = MappingProxyType({
+    'duration_minutes': 10,
+    'exercises': (
+        {'name': 'Static stretching', 'duration': '5 min'},
+        {'name': 'Deep breathing', 'duration': '5 min'},
+    ),
+})
+
+
+def _copy_routine(template: MappingProxyType) -> Dict:
+    """Fresh, caller-mutable copy of a routine template.
+
+    The nested exercise dicts are copied too - a shallow dict() would
+    hand every caller the same module-level objects, so one caller's
+    edit would leak into all later payloads.
+    """
+    routine = dict(template)
+    routine['exercises'] = [dict(ex) for ex in template['exercises']]
+    return routine
+
+
+def format_adjustment_message(action: Dict) -> str:
+    """Render the human-readable summary for a plan-adjustment action."""
+    return ("Plan adjusted: intensity=%s, volume=%s, rest_day=%s"
+            % (action.get('intensity'), action.get('volume'), action.get('rest_day')))
+
+
+def create_kafka_producer(bootstrap_servers: str = 'localhost:9092', **config):
+    """
+    Create a KafkaProducer tuned for batched event logging.
+
+    linger/batch settings let many small agent events (mood check-ins,
+    micro-goals, summaries) coalesce into one produce request instead of
+    paying a network round-trip each. Keyword overrides are merged over
+    the defaults.
+    """
+    from kafka import KafkaProducer
+    settings = {
+        'linger_ms': 100,
+        'batch_size': 65536,
+        'acks': 1,
+        'compression_type': 'lz4',
+        'max_in_flight_requests_per_connection': 5,
+    }
+    settings.update(config)
+    return KafkaProducer(bootstrap_servers=bootstrap_servers, **settings)
+
+
+# Process-wide producer cache so per-request AgentTools instances share one
+# TCP connection + metadata session per broker config instead of spawning
+# a producer each.
+_PRODUCER_CACHE: Dict[tuple, Any] = {}
+_PRODUCER_LOCK = threading.Lock()
+
+
+def get_producer(bootstrap_servers: str = 'localhost:9092', **config):
+    """Return the shared KafkaProducer for this bootstrap/config pair."""
+    key = (bootstrap_servers, tuple(sorted(config.items())))
+    with _PRODUCER_LOCK:
+        producer = _PRODUCER_CACHE.get(key)
+        if producer is None:
+            producer = create_kafka_producer(bootstrap_servers, **config)
+            _PRODUCER_CACHE[key] = producer
+        return producer
+
+
+# Tool definitions in OpenAI function-calling format. Built once at import -
+# the schema is static, so rebuilding the nested dicts per request is waste.
+TOOL_DEFINITIONS = [
+    {
+        'type': 'function',
+        'function': {
+            'name': 'adjust_plan',
+            'description': 'Adjust training plan intensity, volume, or schedule a rest day',
+            'parameters': {
+                'type': 'object',
+                'properties': {
+                    'user_id': {'type': 'string'},
+                    'intensity': {'type': 'string', 'enum': ['low', 'moderate', 'high']},
+                    'volume': {'type': 'string', 'enum': ['low', 'moderate', 'high']},
+                    'rest_day': {'type': 'boolean'},
+                    'reason': {'type': 'string'},
+                },
+                'required': ['user_id'],
+            },
+        },
+    },
+    {
+        'type': 'function',
+        'function': {
+            'name': 'explain_plan',
+            'description': 'Explain why a training plan was recommended',
+            'parameters': {
+                'type': 'object',
+                'properties': {
+                    'plan_id': {'type': 'string'},
+                    'rationale': {'type': 'string'},
+                    'key_features': {'type': 'array', 'items': {'type': 'string'}},
+                },
+                'required': ['plan_id', 'rationale'],
+            },
+        },
+    },
+    {
+        'type': 'function',
+        'function': {
+            'name': 'mood_checkin',
+            'description': 'Collect mood and stress check-in from user',
+            'parameters': {
+                'type': 'object',
+                'properties': {
+                    'user_id': {'type': 'string'},
+                    'mood_score': {'type': 'integer', 'minimum': 1, 'maximum': 5},
+                    'stress_level': {'type': 'integer', 'minimum': 1, 'maximum': 5},
+                    'notes': {'type': 'string'},
+                },
+                'required': ['user_id', 'mood_score', 'stress_level'],
+            },
+        },
+    },
+    {
+        'type': 'function',
+        'function': {
+            'name': 'set_micro_goal',
+            'description': 'Set a small daily goal to improve training adherence',
+            'parameters': {
+                'type': 'object',
+                'properties': {
+                    'user_id': {'type': 'string'},
+                    'goal': {'type': 'string'},
+                    'completion_criteria': {'type': 'string'},
+                },
+                'required': ['user_id', 'goal', 'completion_criteria'],
+            },
+        },
+    },
+    {
+        'type': 'function',
+        'function': {
+            'name': 'log_event',
+            'description': 'Log an event to the system for feedback and learning',
+            'parameters': {
+                'type': 'object',
+                'properties': {
+                    'event_type': {'type': 'string'},
+                    'payload': {'type': 'object'},
+                },
+                'required': ['event_type', 'payload'],
+            },
+        },
+    },
+]
+
+# Pre-serialized schema bytes for clients that send the definitions over
+# the wire verbatim - saves re-serializing the static structure per call.
+TOOL_DEFINITIONS_JSON = orjson.dumps(TOOL_DEFINITIONS)
 
 
 class AgentTools:
@@ -16,16 +260,53 @@ class AgentTools:
     These functions can be called by the LLM to perform actions.
     """
     
-    def __init__(self, kafka_producer=None, plan_service=None):
+    # How often the background timer drains buffered events to Kafka
+    FLUSH_INTERVAL_SECONDS = 1.0
+
+    def __init__(self, kafka_producer: Optional[Any] = None, plan_service: Optional[Any] = None,
+                 json_topics: Optional[set] = None) -> None:
         """
         Initialize agent tools.
-        
+
         Args:
             kafka_producer: Kafka producer for event logging
             plan_service: Service for plan management
+            json_topics: Topics whose consumers still require JSON payloads;
+                all other (internal) topics get compact msgpack encoding.
+                Topics shared with OnlineLearningLoop are always JSON.
         """
         self.kafka_producer = kafka_producer
         self.plan_service = plan_service
+        self.json_topics = _SHARED_JSON_TOPICS | frozenset(json_topics or ())
+        self._flush_timer: Optional[threading.Timer] = None
+        if self.kafka_producer is not None:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Arm the next periodic flush."""
+        self._flush_timer = threading.Timer(self.FLUSH_INTERVAL_SECONDS, self._periodic_flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _periodic_flush(self) -> None:
+        """Flush buffered events, then re-arm the timer."""
+        try:
+            self.kafka_producer.flush()
+        except Exception as e:
+            print(f"Error flushing Kafka producer: {e}")
+        self._schedule_flush()
+
+    def close(self) -> None:
+        """Flush outstanding events and release the producer."""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer: Optional[threading.Timer] = None
+        if self.kafka_producer is not None:
+            try:
+                self.kafka_producer.flush()
+                self.kafka_producer.close()
+            except Exception as e:
+                print(f"Error closing Kafka producer: {e}")
     
     # ==================== Training Plan Tools ====================
     
@@ -43,29 +324,32 @@ class AgentTools:
             reason: Reason for adjustment
         
         Returns:
-            Result dictionary
+            Result dictionary; use format_adjustment_message(result['action'])
+            for a human-readable summary
         """
         action = {
             'type': 'plan_adjustment',
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'intensity': intensity,
             'volume': volume,
             'rest_day': rest_day,
             'reason': reason,
         }
-        
+
         # Log event
         self._log_event('training.plan.adjusted', action)
-        
+
         # In production, call plan_service to actually adjust plan
         if self.plan_service:
             # self.plan_service.adjust_plan(user_id, intensity, volume, rest_day)
             pass
-        
+
+        # Message text is built lazily by format_adjustment_message - most
+        # callers only consume the action dict
         return {
             'success': True,
-            'message': f"Plan adjusted: intensity={intensity}, volume={volume}, rest_day={rest_day}",
+            'message': None,
             'action': action,
         }
     
@@ -85,7 +369,7 @@ class AgentTools:
         explanation = {
             'type': 'plan_explanation',
             'plan_id': plan_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'rationale': rationale,
             'key_features': key_features,
         }
@@ -110,29 +394,12 @@ class AgentTools:
         """
         # Simple template-based generation
         # In production, could use LLM or rule-based system
-        
-        warmup = {
-            'duration_minutes': 10,
-            'exercises': [
-                {'name': 'Light cardio', 'duration': '5 min'},
-                {'name': 'Dynamic stretching', 'duration': '5 min'},
-            ],
-        }
-        
-        cooldown = {
-            'duration_minutes': 10,
-            'exercises': [
-                {'name': 'Static stretching', 'duration': '5 min'},
-                {'name': 'Deep breathing', 'duration': '5 min'},
-            ],
-        }
-        
         routine = {
             'type': 'warmup_cooldown',
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
-            'warmup': warmup,
-            'cooldown': cooldown,
+            'timestamp': _now_iso(),
+            'warmup': _copy_routine(_WARMUP_TEMPLATE),
+            'cooldown': _copy_routine(_COOLDOWN_TEMPLATE),
         }
         
         return {
@@ -156,7 +423,7 @@ class AgentTools:
         micro_goal = {
             'type': 'micro_goal',
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'goal': goal,
             'completion_criteria': completion_criteria,
             'status': 'pending',
@@ -188,7 +455,7 @@ class AgentTools:
         checkin = {
             'type': 'mood_checkin',
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'mood_score': mood_score,
             'stress_level': stress_level,
             'notes': notes,
@@ -226,7 +493,7 @@ class AgentTools:
         summary = {
             'type': 'daily_summary',
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'training': {
                 'completed': training_session.get('completed', False),
                 'exercises': training_session.get('exercises', []),
@@ -242,7 +509,9 @@ class AgentTools:
             summary['key_insights'].append("Completed today's training session")
         
         if mood_trends:
-            avg_mood = sum(m.get('mood_score', 3) for m in mood_trends) / len(mood_trends)
+            # fmean runs the accumulation in C - cheaper than a Python
+            # generator sum and no array allocation for short windows
+            avg_mood = fmean(m.get('mood_score', 3) for m in mood_trends)
             if avg_mood < 3:
                 summary['recommendations'].append("Consider lighter training or rest day")
         
@@ -267,15 +536,9 @@ class AgentTools:
         prompt = {
             'type': 'breathing_prompt',
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'duration_seconds': duration_seconds,
-            'instructions': (
-                f"Take {duration_seconds} seconds for this breathing exercise:\n"
-                "1. Inhale slowly for 4 counts\n"
-                "2. Hold for 4 counts\n"
-                "3. Exhale slowly for 4 counts\n"
-                "4. Repeat until time is up"
-            ),
+            'instructions': _breathing_instructions(duration_seconds),
         }
         
         return {
@@ -296,20 +559,12 @@ class AgentTools:
         Returns:
             Motivational message
         """
-        messages = {
-            'short': "You've got this! 💪",
-            'long': "Remember, progress isn't always linear. Every session counts, even the tough ones. You're building resilience along with strength.",
-            'humorous': "Time to turn those muscles into 'mussels' - strong and ready! 🦪",
-            'rational': "Based on your data, you're in a good position to train today. Let's optimize this session.",
-            'balanced': "You've been consistent with your training. Today is another opportunity to move forward, even if it's just a small step.",
-        }
-        
         message = {
             'type': 'motivational_message',
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'style': style,
-            'message': messages.get(style, messages['balanced']),
+            'message': _MOTIVATIONAL_MESSAGES.get(style, _MOTIVATIONAL_MESSAGES['balanced']),
             'context': context,
         }
         
@@ -337,33 +592,38 @@ class AgentTools:
         """Internal event logging."""
         event = {
             'event_type': event_type,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'payload': payload,
         }
         
-        # Send to Kafka if producer available
+        # Send to Kafka if producer available. No flush here - the producer
+        # batches via linger_ms and the periodic timer drains stragglers.
         if self.kafka_producer:
             try:
                 topic = self._get_topic_for_event_type(event_type)
-                self.kafka_producer.send(topic, value=json.dumps(event))
-                self.kafka_producer.flush()
+                self.kafka_producer.send(topic, value=self._encode_event(topic, event))
             except Exception as e:
                 print(f"Error logging event to Kafka: {e}")
-        
+
         return {
             'success': True,
             'event': event,
         }
-    
+
+    def _encode_event(self, topic: str, event: Dict) -> bytes:
+        """Encode an event for its topic.
+
+        Internal topics get msgpack (2-3x smaller on the wire than JSON);
+        topics with external consumers can opt back into JSON via
+        json_topics. default=str covers any datetime still in the payload.
+        """
+        if topic in self.json_topics:
+            return orjson.dumps(event, default=str)
+        return msgpack.packb(event, use_bin_type=True, default=str)
+
     def _get_topic_for_event_type(self, event_type: str) -> str:
         """Map event type to Kafka topic."""
-        topic_mapping = {
-            'training.plan.adjusted': 'training.plan.served',
-            'agent.user.feedback': 'training.user.feedback',
-            'agent.daily_summary': 'agent.conversation.events',
-            'agent.micro_goal.set': 'agent.conversation.events',
-        }
-        return topic_mapping.get(event_type, 'agent.conversation.events')
+        return _topic_for(event_type)
     
     def request_more_info(self, user_id: str, question: str,
                          context: str = "") -> Dict:
@@ -381,7 +641,7 @@ class AgentTools:
         request = {
             'type': 'info_request',
             'user_id': user_id,
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _now_iso(),
             'question': question,
             'context': context,
         }
@@ -398,88 +658,75 @@ class AgentTools:
         Returns:
             List of tool definitions in OpenAI format
         """
-        return [
-            {
-                'type': 'function',
-                'function': {
-                    'name': 'adjust_plan',
-                    'description': 'Adjust training plan intensity, volume, or schedule a rest day',
-                    'parameters': {
-                        'type': 'object',
-                        'properties': {
-                            'user_id': {'type': 'string'},
-                            'intensity': {'type': 'string', 'enum': ['low', 'moderate', 'high']},
-                            'volume': {'type': 'string', 'enum': ['low', 'moderate', 'high']},
-                            'rest_day': {'type': 'boolean'},
-                            'reason': {'type': 'string'},
-                        },
-                        'required': ['user_id'],
-                    },
-                },
-            },
-            {
-                'type': 'function',
-                'function': {
-                    'name': 'explain_plan',
-                    'description': 'Explain why a training plan was recommended',
-                    'parameters': {
-                        'type': 'object',
-                        'properties': {
-                            'plan_id': {'type': 'string'},
-                            'rationale': {'type': 'string'},
-                            'key_features': {'type': 'array', 'items': {'type': 'string'}},
-                        },
-                        'required': ['plan_id', 'rationale'],
-                    },
-                },
-            },
-            {
-                'type': 'function',
-                'function': {
-                    'name': 'mood_checkin',
-                    'description': 'Collect mood and stress check-in from user',
-                    'parameters': {
-                        'type': 'object',
-                        'properties': {
-                            'user_id': {'type': 'string'},
-                            'mood_score': {'type': 'integer', 'minimum': 1, 'maximum': 5},
-                            'stress_level': {'type': 'integer', 'minimum': 1, 'maximum': 5},
-                            'notes': {'type': 'string'},
-                        },
-                        'required': ['user_id', 'mood_score', 'stress_level'],
-                    },
-                },
-            },
-            {
-                'type': 'function',
-                'function': {
-                    'name': 'set_micro_goal',
-                    'description': 'Set a small daily goal to improve training adherence',
-                    'parameters': {
-                        'type': 'object',
-                        'properties': {
-                            'user_id': {'type': 'string'},
-                            'goal': {'type': 'string'},
-                            'completion_criteria': {'type': 'string'},
-                        },
-                        'required': ['user_id', 'goal', 'completion_criteria'],
-                    },
-                },
-            },
-            {
-                'type': 'function',
-                'function': {
-                    'name': 'log_event',
-                    'description': 'Log an event to the system for feedback and learning',
-                    'parameters': {
-                        'type': 'object',
-                        'properties': {
-                            'event_type': {'type': 'string'},
-                            'payload': {'type': 'object'},
-                        },
-                        'required': ['event_type', 'payload'],
-                    },
-                },
-            },
-        ]
+        return TOOL_DEFINITIONS
 
+
+
+def create_async_kafka_producer(bootstrap_servers: str = 'localhost:9092'):
+    """
+    Create an AIOKafkaProducer with the same batching profile as the
+    sync producer. Call await producer.start() before use.
+    """
+    from aiokafka import AIOKafkaProducer
+    return AIOKafkaProducer(
+        bootstrap_servers=bootstrap_servers,
+        linger_ms=100,
+        max_batch_size=65536,
+        acks=1,
+        compression_type='lz4',
+    )
+
+
+class AsyncAgentTools(AgentTools):
+    """
+    Event-loop-friendly AgentTools backed by aiokafka.
+
+    Sends are scheduled as tasks on the running loop instead of blocking
+    it, so Kafka I/O overlaps the LLM inference latency that dominates an
+    agent turn. aiokafka batches via linger_ms, so no flush timer runs.
+    """
+
+    def __init__(self, kafka_producer: Optional[Any] = None, plan_service: Optional[Any] = None,
+                 json_topics: Optional[set] = None) -> None:
+        self.kafka_producer = kafka_producer
+        self.plan_service = plan_service
+        self.json_topics = _SHARED_JSON_TOPICS | frozenset(json_topics or ())
+        self._flush_timer = None
+
+    async def start(self) -> None:
+        """Start the underlying aiokafka producer."""
+        if self.kafka_producer is not None:
+            await self.kafka_producer.start()
+
+    async def stop(self) -> None:
+        """Flush outstanding batches and stop the producer."""
+        if self.kafka_producer is not None:
+            await self.kafka_producer.stop()
+
+    def close(self) -> None:
+        """Sync close is a no-op here; use await stop() instead."""
+
+    def _log_event(self, event_type: str, payload: Dict) -> Dict:
+        """Internal event logging - fire-and-forget on the event loop."""
+        event = {
+            'event_type': event_type,
+            'timestamp': _now_iso(),
+            'payload': payload,
+        }
+
+        if self.kafka_producer:
+            try:
+                topic = self._get_topic_for_event_type(event_type)
+                # producer.send is a coroutine; schedule it so the tool
+                # call returns immediately and the batch fills in the
+                # background.
+                asyncio.get_running_loop().create_task(
+                    self.kafka_producer.send(topic, value=self._encode_event(topic, event))
+                )
+            except Exception as e:
+                print(f"Error logging event to Kafka: {e}")
+
+        return {
+            'success': True,
+            'event': event,
+        }
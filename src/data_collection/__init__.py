@@ -5,27 +5,37 @@ This module provides tools for collecting data from various sources:
 - Oura Ring API
 - Apple Health export
 - Training logs
+
+Submodules are imported lazily (PEP 562) so that importing the package -
+e.g. from the agent's cold-start path - does not pull in pandas/lxml
+until a collector is actually used.
 """
 
-# Import Apple Health parser (no external dependencies)
-from .apple_health import AppleHealthParser
-
-# Import Training Logger (no external dependencies)
-from .training_log import TrainingLogger
-
-# Import Oura API (optional - requires python-oura)
-try:
-    from .oura_api import OuraDataCollector
-    __all__ = [
-        'OuraDataCollector',
-        'AppleHealthParser',
-        'TrainingLogger',
-    ]
-except ImportError:
-    # Oura API not available (python-oura not installed)
-    # This is OK if you already have Oura CSV data
-    __all__ = [
-        'AppleHealthParser',
-        'TrainingLogger',
-    ]
+import importlib
+
+# Public name -> defining submodule, resolved on first attribute access
+_LAZY_IMPORTS = {
+    'AppleHealthParser': '.apple_health',
+    'TrainingLogger': '.training_log',
+    'OuraDataCollector': '.oura_api',  # optional - requires python-oura
+}
+
+__all__ = [
+    'OuraDataCollector',
+    'AppleHealthParser',
+    'TrainingLogger',
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(module_name, __name__)
+    value = getattr(module, name)
+    globals()[name] = value  # cache so subsequent lookups skip __getattr__
+    return value
+
 
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
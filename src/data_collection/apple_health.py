@@ -4,11 +4,71 @@ Apple Health Data Collection Module
 This module provides functions to parse and process Apple Health export data.
 """
 
-import xml.etree.ElementTree as ET
+try:
+    # lxml parses large exports 2-4x faster and supports tag-filtered
+    # iterparse plus true sibling pruning; stdlib ElementTree is the fallback
+    from lxml import etree as ET
+    _HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _HAS_LXML = False
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Optional, Dict, List
+from xml.sax.saxutils import unescape
+import mmap
 import os
+import re
+
+
+# Apple Health timestamps use one fixed layout; passing it explicitly keeps
+# pd.to_datetime on its C fast path instead of per-element dateutil parsing.
+APPLE_DATE_FORMAT = '%Y-%m-%d %H:%M:%S %z'
+
+# Apple's export writes each Record tag on its own line, so parallel workers
+# can regex-scan raw byte slices instead of running an XML parser.
+_RECORD_RE = re.compile(rb'<Record\s[^>]*?/?>')
+_ATTR_RE = re.compile(rb'(\w+)="([^"]*)"')
+
+# Entities beyond the XML default set that appear in quoted attributes
+_XML_ENTITIES = {'&quot;': '"', '&apos;': "'"}
+
+# Below this size the process pool costs more than it saves
+_PARALLEL_MIN_BYTES = 64 * 1024 * 1024
+
+
+def _decode_attr(raw: Optional[bytes]) -> Optional[str]:
+    """Decode one raw attribute value, unescaping XML entities if present."""
+    if raw is None:
+        return None
+    text = raw.decode()
+    if '&' in text:
+        text = unescape(text, _XML_ENTITIES)
+    return text
+
+
+def _parse_chunk(args) -> tuple:
+    """
+    Worker: extract Record attributes from one byte range of the export.
+
+    Runs in a separate process; mmaps the file and regex-scans its slice,
+    returning one list per column.
+    """
+    path, start, stop = args
+    orig_types, values, starts, ends, sources = [], [], [], [], []
+
+    with open(path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for match in _RECORD_RE.finditer(mm, start, stop):
+            attrs = dict(_ATTR_RE.findall(match.group(0)))
+            orig_types.append(_decode_attr(attrs.get(b'type')))
+            values.append(_decode_attr(attrs.get(b'value')))
+            starts.append(_decode_attr(attrs.get(b'startDate')))
+            ends.append(_decode_attr(attrs.get(b'endDate')))
+            sources.append(_decode_attr(attrs.get(b'sourceName')))
+
+    return orig_types, values, starts, ends, sources
 
 
 class AppleHealthParser:
@@ -25,7 +85,39 @@ class AppleHealthParser:
         'HKCategoryTypeIdentifierSleepAnalysis': 'sleep',
         'HKWorkoutTypeIdentifier': 'workout',
     }
-    
+
+    # Apple type-identifier sets for streaming single-type queries
+    HEART_RATE_TYPES = frozenset({
+        'HKQuantityTypeIdentifierHeartRate',
+        'HKQuantityTypeIdentifierRestingHeartRate',
+    })
+    ACTIVITY_TYPES = frozenset({
+        'HKQuantityTypeIdentifierStepCount',
+        'HKQuantityTypeIdentifierActiveEnergyBurned',
+        'HKQuantityTypeIdentifierBasalEnergyBurned',
+    })
+    SLEEP_TYPES = frozenset({'HKCategoryTypeIdentifierSleepAnalysis'})
+    WORKOUT_TYPES = frozenset({'HKWorkoutTypeIdentifier'})
+    HRV_TYPES = frozenset({'HKQuantityTypeIdentifierHeartRateVariabilitySDNN'})
+
+    # Dataset dispatch tables: which mapped type names feed each dataset,
+    # and which _finalize options apply. All five getters share one
+    # parameterized finalizer instead of five near-identical methods.
+    DATASET_TYPES = {
+        'heart_rate': ('heart_rate', 'resting_heart_rate'),
+        'activity': ('steps', 'active_energy', 'basal_energy'),
+        'sleep': ('sleep',),
+        'workouts': ('workout',),
+        'hrv': ('hrv',),
+    }
+    DATASET_CONFIG = {
+        'heart_rate': {'numeric': True},
+        'activity': {'numeric': True},
+        'sleep': {'duration_unit': 3600},   # hours
+        'workouts': {'duration_unit': 60},  # minutes
+        'hrv': {'numeric': True},
+    }
+
     def __init__(self, xml_file_path: str):
         """
         Initialize parser with Apple Health export XML file.
@@ -41,140 +133,268 @@ class AppleHealthParser:
             )
         
         self.xml_path = xml_file_path
-        self.tree = ET.parse(xml_file_path)
-        self.root = self.tree.getroot()
-    
-    def parse_records(self) -> pd.DataFrame:
+        self._records_df: Optional[pd.DataFrame] = None
+        self._all_data: Optional[Dict[str, pd.DataFrame]] = None
+
+    def _iter_records(self):
         """
-        Parse all health records from XML.
-        
+        Yield each Record element, releasing parsed memory as it goes.
+
+        With lxml, iterparse filters on the Record tag in C and completed
+        siblings are pruned off the parent; the stdlib fallback tracks the
+        root element and drops its children after each yield.
+        """
+        if _HAS_LXML:
+            for _, elem in ET.iterparse(self.xml_path, events=('end',), tag='Record'):
+                yield elem
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+        else:
+            root = None
+            for event, elem in ET.iterparse(self.xml_path, events=('start', 'end')):
+                if event == 'start':
+                    if root is None:
+                        root = elem
+                    continue
+                if elem.tag != 'Record':
+                    continue
+                yield elem
+                # Release the element and any completed siblings on the root
+                elem.clear()
+                del root[:]
+
+    def parse_records(self, filter_types: Optional[frozenset] = None) -> pd.DataFrame:
+        """
+        Parse health records from XML in a single streaming pass.
+
+        Uses iterparse instead of building the full DOM, clearing each
+        Record element (and its processed siblings) as soon as it has been
+        read, so memory stays flat even for multi-GB exports. A full parse
+        is cached so the per-type getters share one pass instead of
+        re-walking the XML.
+
+        Args:
+            filter_types: Optional set of Apple type identifiers; records
+                of other types are discarded during the parse, so a
+                single-type query never materializes the rest of the
+                export. Filtered parses are not cached.
+
+        Returns:
+            DataFrame with the (matching) health records
+        """
+        if self._records_df is not None:
+            if filter_types is None:
+                return self._records_df
+            return self._records_df[self._records_df['original_type'].isin(filter_types)]
+
+        # Column lists (struct-of-arrays) instead of one dict per record:
+        # pandas builds each column in one shot from a homogeneous list,
+        # which is far cheaper than reassembling a list of row dicts.
+        orig_types = []
+        values = []
+        starts = []
+        ends = []
+        sources = []
+
+        for elem in self._iter_records():
+            record_type = elem.get('type')
+            if filter_types is not None and record_type not in filter_types:
+                continue
+
+            orig_types.append(record_type)
+            values.append(elem.get('value'))
+            starts.append(elem.get('startDate'))
+            ends.append(elem.get('endDate'))
+            sources.append(elem.get('sourceName'))
+
+        # Map to readable type names in one C-level comprehension
+        type_map = self.RELEVANT_TYPES.get
+        records_df = pd.DataFrame({
+            'type': [type_map(t, t) for t in orig_types],
+            'original_type': orig_types,
+            'value': values,
+            'start_date': starts,
+            'end_date': ends,
+            'source': sources,
+        })
+        if filter_types is None:
+            self._records_df = records_df
+        return records_df
+
+    def parse_records_parallel(self, n_workers: Optional[int] = None) -> pd.DataFrame:
+        """
+        Parse all health records using a pool of byte-range workers.
+
+        Apple's export puts each Record tag on one line, so the file is
+        split into newline-aligned byte ranges and each worker regex-scans
+        its slice in a separate process - the attribute extraction that is
+        pure-Python overhead in iterparse runs in C and in parallel.
+        Falls back to the streaming parse for small files or if the
+        chunked scan fails (e.g. a non-conforming export).
+
+        Args:
+            n_workers: Process count (defaults to os.cpu_count())
+
         Returns:
             DataFrame with all health records
         """
-        records = []
-        
-        for record in self.root.findall('.//Record'):
-            record_type = record.get('type')
-            value = record.get('value')
-            start_date = record.get('startDate')
-            end_date = record.get('endDate')
-            source_name = record.get('sourceName')
-            
-            # Map to readable type name
-            type_name = self.RELEVANT_TYPES.get(record_type, record_type)
-            
-            records.append({
-                'type': type_name,
-                'original_type': record_type,
-                'value': value,
-                'start_date': start_date,
-                'end_date': end_date,
-                'source': source_name,
-            })
-        
-        return pd.DataFrame(records)
+        if self._records_df is not None:
+            return self._records_df
+
+        size = os.path.getsize(self.xml_path)
+        n_workers = n_workers or os.cpu_count() or 1
+        if n_workers <= 1 or size < _PARALLEL_MIN_BYTES:
+            return self.parse_records()
+
+        # Align chunk boundaries to line starts so no Record tag straddles one
+        offsets = [size * i // n_workers for i in range(n_workers + 1)]
+        with open(self.xml_path, 'rb') as f:
+            for i in range(1, n_workers):
+                f.seek(offsets[i])
+                f.readline()
+                offsets[i] = f.tell()
+
+        tasks = [(self.xml_path, offsets[i], offsets[i + 1])
+                 for i in range(n_workers)
+                 if offsets[i] < offsets[i + 1]]
+
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                chunks = list(executor.map(_parse_chunk, tasks))
+        except Exception:
+            return self.parse_records()
+
+        orig_types, values, starts, ends, sources = (
+            [item for chunk in chunks for item in chunk[i]] for i in range(5))
+
+        type_map = self.RELEVANT_TYPES.get
+        self._records_df = pd.DataFrame({
+            'type': [type_map(t, t) for t in orig_types],
+            'original_type': orig_types,
+            'value': values,
+            'start_date': starts,
+            'end_date': ends,
+            'source': sources,
+        })
+        return self._records_df
     
+    def _finalize(self, df: pd.DataFrame, numeric: bool = False,
+                  duration_unit: Optional[int] = None) -> pd.DataFrame:
+        """
+        Shared per-type post-processing: casts, optional duration, sort.
+
+        Args:
+            df: Record subset for one dataset
+            numeric: Cast the value column to numeric
+            duration_unit: If set, parse end_date and add a duration column
+                in units of this many seconds (3600 = hours, 60 = minutes)
+        """
+        if df.empty:
+            return df
+
+        if numeric:
+            df['value'] = pd.to_numeric(df['value'], errors='coerce')
+        df['start_date'] = pd.to_datetime(df['start_date'], format=APPLE_DATE_FORMAT,
+                                          errors='coerce', cache=True)
+        if duration_unit is not None:
+            df['end_date'] = pd.to_datetime(df['end_date'], format=APPLE_DATE_FORMAT,
+                                            errors='coerce', cache=True)
+            df['duration'] = (df['end_date'] - df['start_date']).dt.total_seconds() / duration_unit
+
+        return df.sort_values('start_date')
+
     def get_heart_rate_data(self) -> pd.DataFrame:
         """
         Extract heart rate data.
-        
+
         Returns:
             DataFrame with heart rate records
         """
-        df = self.parse_records()
-        hr_df = df[df['type'].isin(['heart_rate', 'resting_heart_rate'])].copy()
-        
-        if not hr_df.empty:
-            hr_df['value'] = pd.to_numeric(hr_df['value'], errors='coerce')
-            hr_df['start_date'] = pd.to_datetime(hr_df['start_date'], errors='coerce')
-            hr_df = hr_df.sort_values('start_date')
-        
-        return hr_df
-    
+        return self._dataset('heart_rate', self.HEART_RATE_TYPES)
+
     def get_activity_data(self) -> pd.DataFrame:
         """
         Extract activity data (steps, calories).
-        
+
         Returns:
             DataFrame with activity records
         """
-        df = self.parse_records()
-        activity_df = df[df['type'].isin(['steps', 'active_energy', 'basal_energy'])].copy()
-        
-        if not activity_df.empty:
-            activity_df['value'] = pd.to_numeric(activity_df['value'], errors='coerce')
-            activity_df['start_date'] = pd.to_datetime(activity_df['start_date'], errors='coerce')
-            activity_df = activity_df.sort_values('start_date')
-        
-        return activity_df
-    
+        return self._dataset('activity', self.ACTIVITY_TYPES)
+
     def get_sleep_data(self) -> pd.DataFrame:
         """
         Extract sleep data.
-        
+
         Returns:
             DataFrame with sleep records
         """
-        df = self.parse_records()
-        sleep_df = df[df['type'] == 'sleep'].copy()
-        
-        if not sleep_df.empty:
-            sleep_df['start_date'] = pd.to_datetime(sleep_df['start_date'], errors='coerce')
-            sleep_df['end_date'] = pd.to_datetime(sleep_df['end_date'], errors='coerce')
-            sleep_df['duration'] = (sleep_df['end_date'] - sleep_df['start_date']).dt.total_seconds() / 3600  # hours
-            sleep_df = sleep_df.sort_values('start_date')
-        
-        return sleep_df
-    
+        return self._dataset('sleep', self.SLEEP_TYPES)
+
     def get_workout_data(self) -> pd.DataFrame:
         """
         Extract workout data.
-        
+
         Returns:
             DataFrame with workout records
         """
-        df = self.parse_records()
-        workout_df = df[df['type'] == 'workout'].copy()
-        
-        if not workout_df.empty:
-            workout_df['start_date'] = pd.to_datetime(workout_df['start_date'], errors='coerce')
-            workout_df['end_date'] = pd.to_datetime(workout_df['end_date'], errors='coerce')
-            workout_df['duration'] = (workout_df['end_date'] - workout_df['start_date']).dt.total_seconds() / 60  # minutes
-            workout_df = workout_df.sort_values('start_date')
-        
-        return workout_df
-    
+        return self._dataset('workouts', self.WORKOUT_TYPES)
+
     def get_hrv_data(self) -> pd.DataFrame:
         """
         Extract HRV (Heart Rate Variability) data.
-        
+
         Returns:
             DataFrame with HRV records
         """
-        df = self.parse_records()
-        hrv_df = df[df['type'] == 'hrv'].copy()
-        
-        if not hrv_df.empty:
-            hrv_df['value'] = pd.to_numeric(hrv_df['value'], errors='coerce')
-            hrv_df['start_date'] = pd.to_datetime(hrv_df['start_date'], errors='coerce')
-            hrv_df = hrv_df.sort_values('start_date')
-        
-        return hrv_df
-    
+        return self._dataset('hrv', self.HRV_TYPES)
+
+    def _dataset(self, name: str, filter_types: frozenset) -> pd.DataFrame:
+        """
+        One finalized dataset, served from the all-data cache when present.
+
+        Falls back to a streaming filtered parse so a single-type query
+        never materializes the rest of the export.
+        """
+        if self._all_data is not None:
+            return self._all_data[name].copy()
+        return self._finalize(self.parse_records(filter_types=filter_types).copy(),
+                              **self.DATASET_CONFIG[name])
+
     def get_all_data(self) -> Dict[str, pd.DataFrame]:
         """
         Extract all relevant data types.
-        
+
+        Partitions the cached records with a single groupby, finalizes
+        each dataset once via the DATASET_TYPES/DATASET_CONFIG dispatch
+        tables, and caches the result for the per-type getters.
+
         Returns:
             Dictionary with DataFrames for each data type
         """
-        return {
-            'heart_rate': self.get_heart_rate_data(),
-            'activity': self.get_activity_data(),
-            'sleep': self.get_sleep_data(),
-            'workouts': self.get_workout_data(),
-            'hrv': self.get_hrv_data(),
-        }
+        if self._all_data is None:
+            df = self.parse_records()
+            if df.empty:
+                self._all_data = {name: df.copy() for name in self.DATASET_TYPES}
+            else:
+                groups = dict(tuple(df.groupby('type', sort=False)))
+                empty = df.iloc[0:0]
+
+                def subset(type_names):
+                    frames = [groups[name] for name in type_names if name in groups]
+                    if not frames:
+                        return empty.copy()
+                    if len(frames) == 1:
+                        return frames[0].copy()
+                    return pd.concat(frames)
+
+                self._all_data = {
+                    name: self._finalize(subset(type_names),
+                                         **self.DATASET_CONFIG[name])
+                    for name, type_names in self.DATASET_TYPES.items()
+                }
+
+        return {name: frame.copy() for name, frame in self._all_data.items()}
     
     def save_to_csv(self, output_dir: str):
         """
@@ -184,12 +404,35 @@ class AppleHealthParser:
             output_dir: Directory to save CSV files
         """
         os.makedirs(output_dir, exist_ok=True)
-        
+
         data = self.get_all_data()
         for data_type, df in data.items():
             if not df.empty:
                 file_path = os.path.join(output_dir, f'apple_health_{data_type}.csv')
-                df.to_csv(file_path, index=False)
+                try:
+                    # Arrow's multithreaded writer is ~10x the default
+                    df.to_csv(file_path, index=False, engine='pyarrow')
+                except (TypeError, ValueError):
+                    df.to_csv(file_path, index=False)
+                print(f"Saved {data_type} data to {file_path}")
+
+    def save_to_parquet(self, output_dir: str):
+        """
+        Save all data to Parquet files.
+
+        Preferred over CSV for large exports: columnar, compressed, and
+        downstream preprocessing loads it without re-parsing text.
+
+        Args:
+            output_dir: Directory to save Parquet files
+        """
+        os.makedirs(output_dir, exist_ok=True)
+
+        data = self.get_all_data()
+        for data_type, df in data.items():
+            if not df.empty:
+                file_path = os.path.join(output_dir, f'apple_health_{data_type}.parquet')
+                df.to_parquet(file_path, index=False, compression='zstd')
                 print(f"Saved {data_type} data to {file_path}")
 
 
@@ -6,14 +6,17 @@ Unifies multi-source data (Apple Watch, Oura, PMData) into a single daily schema
 
 import pandas as pd
 import numpy as np
+import pyarrow.csv as pacsv
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime
+import csv
 import sys
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from src.data_collection.apple_health import AppleHealthParser
+from src.data_collection.apple_health import AppleHealthParser, APPLE_DATE_FORMAT
 
 
 class DataPreprocessor:
@@ -67,16 +70,22 @@ class DataPreprocessor:
         if hr_df.empty:
             return pd.DataFrame(columns=['date'])
         
-        hr_df['date'] = pd.to_datetime(hr_df['start_date']).dt.date
-        hr_df['value'] = pd.to_numeric(hr_df['value'], errors='coerce')
-        
-        daily = hr_df.groupby('date').agg({
-            'value': ['mean', 'min', 'max', 'std']
-        }).reset_index()
-        
-        daily.columns = ['date', 'hr_mean', 'hr_min', 'hr_max', 'hr_std']
+        hr_df['date'] = pd.to_datetime(hr_df['start_date'], format=APPLE_DATE_FORMAT,
+                                       utc=True, errors='coerce',
+                                       cache=True).dt.tz_localize(None).dt.floor('D')
+        # float32 halves memory bandwidth through the groupby reducers
+        hr_df['value'] = pd.to_numeric(hr_df['value'], errors='coerce', downcast='float')
+
+        # Named aggregation skips the MultiIndex column build + positional rename
+        daily = hr_df.groupby('date', sort=False).agg(
+            hr_mean=('value', 'mean'),
+            hr_min=('value', 'min'),
+            hr_max=('value', 'max'),
+            hr_std=('value', 'std'),
+        ).reset_index()
+
         daily['resting_hr'] = daily['hr_min']  # Approximate resting HR
-        
+
         return daily
     
     def _aggregate_activity(self, activity_df: pd.DataFrame) -> pd.DataFrame:
@@ -84,25 +93,41 @@ class DataPreprocessor:
         if activity_df.empty:
             return pd.DataFrame(columns=['date'])
         
-        activity_df['date'] = pd.to_datetime(activity_df['start_date']).dt.date
+        activity_df['date'] = pd.to_datetime(activity_df['start_date'], format=APPLE_DATE_FORMAT,
+                                             utc=True, errors='coerce',
+                                             cache=True).dt.tz_localize(None).dt.floor('D')
         activity_df['value'] = pd.to_numeric(activity_df['value'], errors='coerce')
-        
-        daily = activity_df.groupby(['date', 'type']).agg({
-            'value': 'sum'
-        }).reset_index()
-        
-        # Pivot to wide format
-        daily_wide = daily.pivot(index='date', columns='type', values='value').reset_index()
+
+        # Categorical type codes let groupby hash small ints, and
+        # sum().unstack() goes straight to wide format without the
+        # intermediate long frame + pivot + second reset_index.
+        activity_df['type'] = pd.Categorical(
+            activity_df['type'],
+            categories=['steps', 'active_energy', 'basal_energy'],
+        )
+        daily_wide = (
+            activity_df.groupby(['date', 'type'], observed=True, sort=False)['value']
+            .sum()
+            .unstack('type')
+            .reset_index()
+        )
         daily_wide.columns.name = None
-        
+
         # Rename columns
         rename_map = {
-            'steps': 'steps',
             'active_energy': 'active_calories',
             'basal_energy': 'basal_calories',
         }
         daily_wide = daily_wide.rename(columns=rename_map)
-        
+
+        # Steps are counts: the masked Int32 dtype keeps them integer
+        # through later outer alignment instead of decaying to float64
+        if 'steps' in daily_wide.columns:
+            try:
+                daily_wide['steps'] = daily_wide['steps'].astype('Int32')
+            except (TypeError, ValueError):
+                pass  # non-integral values: leave as float
+
         return daily_wide
     
     def _aggregate_sleep(self, sleep_df: pd.DataFrame) -> pd.DataFrame:
@@ -110,7 +135,9 @@ class DataPreprocessor:
         if sleep_df.empty:
             return pd.DataFrame(columns=['date'])
         
-        sleep_df['date'] = pd.to_datetime(sleep_df['start_date']).dt.date
+        sleep_df['date'] = pd.to_datetime(sleep_df['start_date'], format=APPLE_DATE_FORMAT,
+                                          utc=True, errors='coerce',
+                                          cache=True).dt.tz_localize(None).dt.floor('D')
         
         daily = sleep_df.groupby('date').agg({
             'duration': 'sum'
@@ -130,9 +157,6 @@ class DataPreprocessor:
         Returns:
             DataFrame with daily Oura features
         """
-        df = pd.read_csv(csv_path)
-        df['date'] = pd.to_datetime(df['date']).dt.date
-        
         # Select key features
         key_features = [
             'date',
@@ -146,9 +170,21 @@ class DataPreprocessor:
             'Total Burn',
             'Activity Burn',
         ]
-        
-        available_features = [f for f in key_features if f in df.columns]
-        oura_daily = df[available_features].copy()
+
+        # Read the header alone to learn which features the export has,
+        # then let Arrow's multithreaded reader pull only those columns
+        # instead of parsing and dtype-inferring the full wide CSV.
+        with open(csv_path, newline='') as f:
+            header = set(next(csv.reader(f)))
+        available_features = [f for f in key_features if f in header]
+
+        table = pacsv.read_csv(
+            csv_path,
+            convert_options=pacsv.ConvertOptions(include_columns=available_features),
+        )
+        oura_daily = table.to_pandas()
+        oura_daily['date'] = pd.to_datetime(oura_daily['date'], format='ISO8601',
+                                            errors='coerce', cache=True)
         
         # Rename to canonical names
         rename_map = {
@@ -164,7 +200,16 @@ class DataPreprocessor:
         }
         
         oura_daily = oura_daily.rename(columns=rename_map)
-        
+
+        # Counts and calorie totals are integers in the Oura export; keep
+        # them as masked Int32 rather than NaN-forced float64
+        for col in ('steps', 'total_calories', 'active_calories'):
+            if col in oura_daily.columns:
+                try:
+                    oura_daily[col] = oura_daily[col].astype('Int32')
+                except (TypeError, ValueError):
+                    pass  # non-integral values: leave as float
+
         return oura_daily
     
     def preprocess_pmdata(self, pmdata_dir: str) -> pd.DataFrame:
@@ -178,30 +223,26 @@ class DataPreprocessor:
             DataFrame with daily PMData features
         """
         pmdata_path = Path(pmdata_dir)
-        participants = sorted([d for d in pmdata_path.iterdir() 
-                              if d.is_dir() and d.name.startswith('p')])
-        
-        all_daily = []
-        
-        for p_dir in participants:
-            user_id = p_dir.name
-            
-            # Load Fitbit data
-            fitbit_dir = p_dir / 'fitbit'
-            if fitbit_dir.exists():
-                # Load sleep_score.csv if available
-                sleep_file = fitbit_dir / 'sleep_score.csv'
-                if sleep_file.exists():
-                    sleep_df = pd.read_csv(sleep_file)
-                    sleep_df['user_id'] = user_id
-                    sleep_df['date'] = pd.to_datetime(sleep_df['timestamp']).dt.date
-                    all_daily.append(sleep_df)
-        
-        if all_daily:
-            combined = pd.concat(all_daily, ignore_index=True)
-            return combined
-        
-        return pd.DataFrame()
+
+        # One glob instead of walking participant dirs by hand
+        paths = sorted(pmdata_path.glob('p*/fitbit/sleep_score.csv'))
+        if not paths:
+            return pd.DataFrame()
+
+        # pd.read_csv releases the GIL in its C parser, so threaded reads
+        # overlap I/O and parsing across participants
+        with ThreadPoolExecutor() as executor:
+            frames = list(executor.map(pd.read_csv, paths))
+
+        for path, sleep_df in zip(paths, frames):
+            sleep_df['user_id'] = path.parent.parent.name
+
+        combined = pd.concat(frames, ignore_index=True)
+        # One vectorized date parse over the combined frame instead of
+        # one call per participant file
+        combined['date'] = pd.to_datetime(combined['timestamp'], errors='coerce',
+                                          cache=True).dt.floor('D')
+        return combined
     
     def unify_daily_data(self, apple_df: pd.DataFrame, oura_df: pd.DataFrame,
                         pmdata_df: Optional[pd.DataFrame] = None,
@@ -218,19 +259,27 @@ class DataPreprocessor:
         Returns:
             Unified daily DataFrame
         """
-        # Add user_id
-        apple_df['user_id'] = user_id
-        oura_df['user_id'] = user_id
-        
-        # Merge Apple + Oura
-        unified = apple_df.merge(
-            oura_df,
-            on=['date', 'user_id'],
-            how='outer',
-            suffixes=('_apple', '_oura')
-        )
-        
-        # Merge PMData if available
+        # Apple and Oura both describe the single given user, so instead of
+        # an outer hash-join on (date, user_id) tuples, align the daily
+        # frames on a shared date index and let concat take the index union.
+        # Overlapping metric names keep the same suffixes the merge applied.
+        overlap = (set(apple_df.columns) & set(oura_df.columns)) - {'date', 'user_id'}
+        if overlap:
+            apple_df = apple_df.rename(columns={c: f'{c}_apple' for c in overlap})
+            oura_df = oura_df.rename(columns={c: f'{c}_oura' for c in overlap})
+
+        parts = [
+            df.drop(columns='user_id', errors='ignore').set_index('date')
+            for df in (apple_df, oura_df)
+            if 'date' in df.columns
+        ]
+        if not parts:
+            return pd.DataFrame()
+
+        unified = pd.concat(parts, axis=1, join='outer').reset_index()
+        unified['user_id'] = user_id
+
+        # Merge PMData if available (multi-participant, so a real join)
         if pmdata_df is not None and not pmdata_df.empty:
             unified = unified.merge(
                 pmdata_df,
@@ -238,19 +287,35 @@ class DataPreprocessor:
                 how='outer',
                 suffixes=('', '_pmdata')
             )
-        
+
         # Sort by date
         unified = unified.sort_values('date').reset_index(drop=True)
         
         # Fill missing user_id
         unified['user_id'] = unified['user_id'].fillna(user_id)
-        
+
+        # Compact dtypes before persisting: a categorical user_id and
+        # float32 metric columns halve the frame's footprint and speed up
+        # downstream RL training loads
+        unified['user_id'] = unified['user_id'].astype('category')
+        for col in unified.select_dtypes('float64').columns:
+            unified[col] = pd.to_numeric(unified[col], downcast='float')
+
+        # Reapply masked integer dtype to count columns the alignment may
+        # have pushed back to float (suffix variants included)
+        for col in unified.columns:
+            if col == 'steps' or col.startswith('steps_'):
+                try:
+                    unified[col] = unified[col].astype('Int32')
+                except (TypeError, ValueError):
+                    pass
+
         return unified
     
     def save_unified_data(self, unified_df: pd.DataFrame, filename: str = "unified_daily.parquet"):
         """Save unified data to parquet."""
         output_path = self.output_dir / filename
-        unified_df.to_parquet(output_path, index=False)
+        unified_df.to_parquet(output_path, index=False, compression='zstd')
         print(f"✓ Saved unified data to {output_path}")
         return output_path
 
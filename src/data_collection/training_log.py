@@ -5,6 +5,9 @@ This module provides functions to log and manage training session data.
 """
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from datetime import datetime
 from typing import List, Dict, Optional
 import os
@@ -13,40 +16,87 @@ import json
 
 class TrainingLogger:
     """Logger for training sessions and subjective feedback."""
-    
-    def __init__(self, log_file: str = "data/raw/training_logs/sessions.csv"):
+
+    COLUMNS = (
+        'date',
+        'exercise_name',
+        'sets',
+        'reps',
+        'weight_kg',
+        'rest_seconds',
+        'rpe',
+        'fatigue',
+        'motivation',
+        'muscle_soreness',
+        'notes',
+        'workout_type',
+        'total_duration_minutes',
+    )
+
+    # Rows buffered in memory before a parquet part is written; keeps
+    # high-rate logging from producing one tiny file per session
+    FLUSH_THRESHOLD = 256
+
+    def __init__(self, log_dir: str = "data/raw/training_logs/sessions",
+                 autoflush: bool = True):
         """
         Initialize training logger.
-        
+
+        Sessions are stored as a month-partitioned Parquet dataset
+        (year=YYYY/month=MM/...), so lookback queries only scan recent
+        partitions and the store is a fraction of the CSV footprint.
+
         Args:
-            log_file: Path to CSV file for storing logs
+            log_dir: Root directory of the session Parquet dataset
+            autoflush: Write rows out on every log_session call. Disable
+                for high-rate programmatic logging and call flush()
+                periodically / on shutdown instead.
         """
-        self.log_file = log_file
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        
-        # Initialize CSV if it doesn't exist
-        if not os.path.exists(log_file):
-            self._initialize_log_file()
-    
-    def _initialize_log_file(self):
-        """Create CSV file with headers."""
-        columns = [
-            'date',
-            'exercise_name',
-            'sets',
-            'reps',
-            'weight_kg',
-            'rest_seconds',
-            'rpe',
-            'fatigue',
-            'motivation',
-            'muscle_soreness',
-            'notes',
-            'workout_type',
-            'total_duration_minutes',
-        ]
-        df = pd.DataFrame(columns=columns)
-        df.to_csv(self.log_file, index=False)
+        self.log_dir = log_dir
+        self.autoflush = autoflush
+        self._buffer: List[Dict] = []
+        os.makedirs(log_dir, exist_ok=True)
+
+    # One fixed schema for every part file. Pinning all columns - not
+    # just the dictionary-encoded ones - keeps batches where an optional
+    # field is entirely None (rpe, muscle_soreness, duration) from being
+    # written as Arrow null columns, which would make later parts
+    # unreadable alongside typed ones. The low-cardinality name columns
+    # are dictionary-encoded: a few distinct values repeat on every row.
+    SCHEMA = pa.schema([
+        ('date', pa.string()),
+        ('exercise_name', pa.dictionary(pa.int16(), pa.string())),
+        ('sets', pa.int64()),
+        ('reps', pa.int64()),
+        ('weight_kg', pa.float64()),
+        ('rest_seconds', pa.int64()),
+        ('rpe', pa.float64()),
+        ('fatigue', pa.int64()),
+        ('motivation', pa.int64()),
+        ('muscle_soreness', pa.int64()),
+        ('notes', pa.string()),
+        ('workout_type', pa.dictionary(pa.int16(), pa.string())),
+        ('total_duration_minutes', pa.int64()),
+        ('year', pa.int64()),
+        ('month', pa.int64()),
+    ])
+
+    def flush(self):
+        """Write buffered session rows as one partitioned parquet part."""
+        if not self._buffer:
+            return
+        df = pd.DataFrame(self._buffer, columns=list(self.COLUMNS) + ['year', 'month'])
+        table = pa.Table.from_pandas(df, preserve_index=False).cast(self.SCHEMA)
+        pq.write_to_dataset(
+            table,
+            root_path=self.log_dir,
+            partition_cols=['year', 'month'],
+            compression='zstd',
+            compression_level=3,
+            use_dictionary=True,
+            data_page_size=64 * 1024,
+        )
+        self._buffer.clear()
     
     def log_exercise(
         self,
@@ -106,7 +156,8 @@ class TrainingLogger:
             notes: Additional session notes
         """
         session_records = []
-        date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        now = datetime.now()
+        date = now.strftime('%Y-%m-%d %H:%M:%S')
         
         for exercise in exercises:
             record = {
@@ -123,15 +174,18 @@ class TrainingLogger:
                 'notes': notes,
                 'workout_type': workout_type,
                 'total_duration_minutes': total_duration_minutes,
+                # Partition keys for the parquet dataset
+                'year': now.year,
+                'month': now.month,
             }
             session_records.append(record)
-        
-        # Append to CSV
-        df_new = pd.DataFrame(session_records)
-        df_existing = pd.read_csv(self.log_file)
-        df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-        df_combined.to_csv(self.log_file, index=False)
-        
+
+        # Append-only: rows go into the buffer and out as a new parquet
+        # part; the historical log is never read or rewritten
+        self._buffer.extend(session_records)
+        if self.autoflush or len(self._buffer) >= self.FLUSH_THRESHOLD:
+            self.flush()
+
         print(f"Logged {len(exercises)} exercises for session on {date}")
     
     def get_recent_sessions(self, days: int = 7) -> pd.DataFrame:
@@ -144,12 +198,28 @@ class TrainingLogger:
         Returns:
             DataFrame with recent sessions
         """
-        df = pd.read_csv(self.log_file)
-        df['date'] = pd.to_datetime(df['date'])
-        
+        self.flush()  # make buffered rows visible to the query
+
         cutoff_date = datetime.now() - pd.Timedelta(days=days)
-        recent_df = df[df['date'] >= cutoff_date]
-        
+
+        dataset = ds.dataset(self.log_dir, format='parquet', partitioning='hive')
+        if not dataset.files:
+            return pd.DataFrame(columns=self.COLUMNS)
+
+        # Timestamps are stored as sortable '%Y-%m-%d %H:%M:%S' strings, so
+        # the cutoff pushes down into the scan and partition pruning skips
+        # historical months entirely
+        cutoff_str = cutoff_date.strftime('%Y-%m-%d %H:%M:%S')
+        recent_df = (
+            dataset.to_table(filter=ds.field('date') >= cutoff_str)
+            .to_pandas()
+            .drop(columns=['year', 'month'])
+        )
+        # Stored timestamps are uniform, so pin the format: the parse hits
+        # the single-strptime fast path instead of per-row inference
+        recent_df['date'] = pd.to_datetime(recent_df['date'],
+                                           format='%Y-%m-%d %H:%M:%S')
+
         return recent_df
     
     def get_session_summary(self, days: int = 30) -> Dict:
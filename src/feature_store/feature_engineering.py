@@ -7,16 +7,153 @@ Creates features for contextual bandits from daily unified data.
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+try:
+    # Optional: JIT-compiles the consistency scan to machine code
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    # Optional: Rust-backed rolling kernels, multi-threaded across columns
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
+
+def _rolling_slope3(y: pd.Series) -> pd.Series:
+    """
+    Closed-form 3-point rolling OLS slope.
+
+    For evenly spaced x = [0, 1, 2] the least-squares slope collapses to
+    (y[t] - y[t-2]) / 2, so no per-window Python callback or polyfit lstsq
+    solve is needed. Matches rolling(3, min_periods=1).apply(polyfit) on
+    fully-populated windows: a two-point window gives the first
+    difference, a single point gives 0. One deliberate difference: a
+    window whose middle value is NaN still yields the finite endpoint
+    slope here, where the polyfit version returned NaN.
+    """
+    slope = (y - y.shift(2)) / 2.0
+    if len(y) > 1:
+        slope.iloc[1] = y.iloc[1] - y.iloc[0]
+    if len(y) > 0:
+        slope.iloc[0] = 0.0
+    return slope
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _consistency_kernel(completion):
+        """
+        Single-pass streak and days-since-training scan.
+
+        streak counts consecutive completed days (0 on a miss);
+        days_since counts rows since the last completed day (0 on it,
+        and the row index before the first one). One linear loop
+        replaces two hash-based groupby passes.
+        """
+        n = completion.shape[0]
+        streak = np.zeros(n, dtype=np.int64)
+        days_since = np.zeros(n, dtype=np.int64)
+        s = 0
+        d = -1
+        for i in range(n):
+            if completion[i] == 1.0:
+                s += 1
+                d = 0
+            else:
+                s = 0
+                d += 1
+            streak[i] = s
+            days_since[i] = d
+        return streak, days_since
+else:
+    def _consistency_kernel(completion):
+        """NumPy fallback: run lengths via cumulative last-seen indices."""
+        n = completion.shape[0]
+        idx = np.arange(n)
+        is_done = completion == 1.0
+
+        last_miss = np.maximum.accumulate(np.where(~is_done, idx, -1))
+        streak = np.where(is_done, idx - last_miss, 0)
+
+        last_done = np.maximum.accumulate(np.where(is_done, idx, -1))
+        days_since = np.where(last_done >= 0, idx - last_done, idx)
+        return streak, days_since
 
 
 class FeatureEngineer:
     """Engineer features for RL model."""
-    
+
+    # (source column, aggregation, output name) for the shared rolling
+    # passes. One rolling object per window walks the column block once
+    # instead of each _create_* method allocating its own pass.
+    ROLL7_FEATURES = (
+        ('hrv', 'mean', 'hrv_7d_mean'),
+        ('hrv', 'std', 'hrv_7d_std'),
+        ('resting_hr', 'mean', 'rhr_7d_mean'),
+        ('sleep_duration_hours', 'mean', 'sleep_7d_mean'),
+        ('readiness_score', 'mean', 'readiness_7d_mean'),
+        ('steps', 'sum', 'steps_7d_sum'),
+        ('steps', 'mean', 'steps_7d_mean'),
+        ('active_calories', 'sum', 'calories_7d_sum'),
+        ('active_calories', 'mean', 'calories_7d_mean'),
+        ('activity_score', 'mean', 'activity_7d_mean'),
+        ('completion', 'mean', 'completion_7d_rate'),
+    )
+    ROLL3_FEATURES = (
+        ('active_calories', 'sum', 'calories_3d_sum'),
+        ('active_calories', 'mean', 'calories_3d_mean'),
+        ('sleep_duration_hours', 'mean', 'sleep_3d_mean'),
+    )
+
+    # Rolling intermediates consumed below but not part of the feature set
+    ROLLING_INTERMEDIATES = ('hrv_7d_std', 'calories_7d_mean', 'calories_3d_mean',
+                             'sleep_3d_mean')
+
+    # Prior rows carried into an incremental recompute so every rolling
+    # window over the new tail sees full context; sized by the largest
+    # window in use (the 28-day resting-HR baseline)
+    WARMUP_ROWS = 27
+
     def __init__(self):
         """Initialize feature engineer."""
-        pass
-    
+        self._cached_df: Optional[pd.DataFrame] = None
+
+    def _add_rolling_features(self, df: pd.DataFrame, window: int,
+                              features: tuple) -> pd.DataFrame:
+        """Compute every rolling aggregate for one window in a fused pass."""
+        spec = {}
+        for col, agg, _name in features:
+            if col in df.columns:
+                spec.setdefault(col, []).append(agg)
+        if not spec:
+            return df
+
+        if HAS_POLARS:
+            # Polars runs the column block in parallel native kernels;
+            # rechunk once so they see contiguous buffers. min_samples=1
+            # matches the pandas min_periods=1 warm-up (std stays ddof=1).
+            exprs = [
+                getattr(pl.col(col), f'rolling_{agg}')(
+                    window_size=window, min_samples=1).alias(name)
+                for col, agg, name in features if col in spec
+            ]
+            rolled = pl.from_pandas(df[list(spec)]).rechunk().select(exprs)
+            for name in rolled.columns:
+                df[name] = rolled[name].to_numpy()
+            return df
+
+        rolled = df[list(spec)].rolling(window=window, min_periods=1).agg(spec)
+        rename = {(col, agg): name for col, agg, name in features}
+        rolled.columns = [rename[key] for key in rolled.columns]
+        for name in rolled.columns:
+            df[name] = rolled[name]
+        return df
+
     def create_daily_features(self, unified_df: pd.DataFrame) -> pd.DataFrame:
         """
         Create daily features from unified data.
@@ -27,100 +164,122 @@ class FeatureEngineer:
         Returns:
             DataFrame with engineered features
         """
-        df = unified_df.copy()
-        
-        # Ensure date is datetime
-        df['date'] = pd.to_datetime(df['date'])
-        df = df.sort_values('date').reset_index(drop=True)
-        
+        # assign + sort_values both return new frames, so the explicit
+        # copy of the whole history is redundant. The date conversion
+        # happens before the sort because the column can mix strings and
+        # Timestamps (update_with_new concats cached rows with caller
+        # input), and those don't compare.
+        df = (unified_df.assign(date=pd.to_datetime(unified_df['date']))
+              .sort_values('date', ignore_index=True))
+
+        # float32 is plenty of precision for bandit features and halves
+        # the bytes every rolling pass below has to move
+        float_cols = df.select_dtypes('float64').columns
+        if len(float_cols):
+            df[float_cols] = df[float_cols].astype(np.float32)
+
+        # Completion placeholder - backfilled from training logs later
+        if 'completion' not in df.columns:
+            df['completion'] = np.nan
+
+        # Fused rolling passes: all 7- and 3-day aggregates in one scan
+        # per window, shared by the feature groups below
+        df = self._add_rolling_features(df, 7, self.ROLL7_FEATURES)
+        df = self._add_rolling_features(df, 3, self.ROLL3_FEATURES)
+
         # Recovery features
         df = self._create_recovery_features(df)
-        
+
         # Load features
         df = self._create_load_features(df)
-        
+
         # Consistency features
         df = self._create_consistency_features(df)
-        
+
         # Temporal features
         df = self._create_temporal_features(df)
-        
+
         # Missing indicators
         df = self._create_missing_indicators(df)
-        
-        return df
-    
+
+        return df.drop(columns=list(self.ROLLING_INTERMEDIATES), errors='ignore')
+
+    def update_with_new(self, new_rows: pd.DataFrame) -> pd.DataFrame:
+        """
+        Incrementally extend the cached feature frame with new daily rows.
+
+        The first call computes features over the full history and caches
+        the result. Later calls recompute only the last WARMUP_ROWS cached
+        rows plus the new rows - enough context for the widest rolling
+        window - and append the new tail, so the online path pays O(new rows)
+        instead of re-rolling the whole history. Counters that look
+        further back than the warm-up window (e.g. a streak longer than
+        WARMUP_ROWS days) are clipped to it, mirroring the min_periods
+        warm-up at the start of a full run.
+
+        Args:
+            new_rows: Unified daily rows newer than everything cached
+
+        Returns:
+            The full feature DataFrame including the new rows
+        """
+        if self._cached_df is None or self._cached_df.empty:
+            self._cached_df = self.create_daily_features(new_rows)
+            return self._cached_df
+
+        warmup = self._cached_df.tail(self.WARMUP_ROWS)
+        window = pd.concat([warmup, new_rows], ignore_index=True)
+        tail = self.create_daily_features(window).iloc[len(warmup):]
+        self._cached_df = pd.concat([self._cached_df, tail], ignore_index=True)
+        return self._cached_df
+
     def _create_recovery_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Create recovery-related features."""
+        """Create recovery-related features (rolling aggregates precomputed)."""
         # HRV features
         if 'hrv' in df.columns:
-            df['hrv_7d_mean'] = df['hrv'].rolling(window=7, min_periods=1).mean()
-            df['hrv_7d_zscore'] = (df['hrv'] - df['hrv_7d_mean']) / (df['hrv'].rolling(window=7, min_periods=1).std() + 1e-6)
-            df['hrv_trend'] = df['hrv'].rolling(window=3, min_periods=1).apply(lambda x: np.polyfit(range(len(x)), x, 1)[0] if len(x) > 1 else 0)
-        
-        # Resting HR features
+            df['hrv_7d_zscore'] = (df['hrv'] - df['hrv_7d_mean']) / (df['hrv_7d_std'] + 1e-6)
+            df['hrv_trend'] = _rolling_slope3(df['hrv'])
+
+        # Resting HR features: a trailing 28-day median baseline is one
+        # vectorized pass instead of a full-history quantile sort, and it
+        # no longer leaks future days into the baseline
         if 'resting_hr' in df.columns:
-            baseline_hr = df['resting_hr'].quantile(0.5)  # Median as baseline
+            baseline_hr = df['resting_hr'].rolling(28, min_periods=1).median()
             df['rhr_deviation'] = df['resting_hr'] - baseline_hr
-            df['rhr_7d_mean'] = df['resting_hr'].rolling(window=7, min_periods=1).mean()
-        
-        # Sleep features
+
+        # Sleep features: debt is just a clamped deficit of the shared
+        # 3-day mean - no per-window Python callback
         if 'sleep_duration_hours' in df.columns:
-            df['sleep_debt'] = df['sleep_duration_hours'].rolling(window=3, min_periods=1).apply(
-                lambda x: max(0, 8 - x.mean()) if len(x) > 0 else 0
-            )
-            df['sleep_7d_mean'] = df['sleep_duration_hours'].rolling(window=7, min_periods=1).mean()
-        
+            df['sleep_debt'] = np.maximum(0.0, 8.0 - df['sleep_3d_mean'])
+
         # Readiness score
         if 'readiness_score' in df.columns:
-            df['readiness_7d_mean'] = df['readiness_score'].rolling(window=7, min_periods=1).mean()
-            df['readiness_trend'] = df['readiness_score'].rolling(window=3, min_periods=1).apply(
-                lambda x: np.polyfit(range(len(x)), x, 1)[0] if len(x) > 1 else 0
-            )
-        
+            df['readiness_trend'] = _rolling_slope3(df['readiness_score'])
+
         return df
-    
+
     def _create_load_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Create training load features."""
-        # Steps features
-        if 'steps' in df.columns:
-            df['steps_7d_sum'] = df['steps'].rolling(window=7, min_periods=1).sum()
-            df['steps_7d_mean'] = df['steps'].rolling(window=7, min_periods=1).mean()
-        
-        # Calories features
-        if 'active_calories' in df.columns:
-            df['calories_7d_sum'] = df['active_calories'].rolling(window=7, min_periods=1).sum()
-            df['calories_3d_sum'] = df['active_calories'].rolling(window=3, min_periods=1).sum()
-        
-        # Activity score
-        if 'activity_score' in df.columns:
-            df['activity_7d_mean'] = df['activity_score'].rolling(window=7, min_periods=1).mean()
-        
-        # Acute:Chronic workload ratio (simplified)
+        """Create training load features (rolling aggregates precomputed)."""
+        # Acute:Chronic workload ratio (simplified). The divide runs on
+        # the raw arrays - no index alignment for a ratio of two columns
+        # that already share the frame's index
         if 'active_calories' in df.columns:
-            acute = df['active_calories'].rolling(window=3, min_periods=1).mean()
-            chronic = df['active_calories'].rolling(window=7, min_periods=1).mean()
+            acute = df['calories_3d_mean'].to_numpy()
+            chronic = df['calories_7d_mean'].to_numpy()
             df['acwr'] = acute / (chronic + 1e-6)
-        
+
         return df
-    
+
     def _create_consistency_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Create consistency/training history features."""
-        # Completion rate (placeholder - will be filled from training logs)
-        if 'completion' not in df.columns:
-            df['completion'] = np.nan
-        
-        if 'completion' in df.columns:
-            df['completion_7d_rate'] = df['completion'].rolling(window=7, min_periods=1).mean()
-        
-        # Streak (consecutive training days)
-        if 'completion' in df.columns:
-            df['streak'] = (df['completion'] == 1).groupby((df['completion'] != 1).cumsum()).cumsum()
-        
-        # Days since last training
+        # Streak and days-since-training in one linear scan instead of
+        # two groupby/cumsum passes
         if 'completion' in df.columns:
-            df['days_since_training'] = df.groupby((df['completion'] == 1).cumsum()).cumcount()
-        
+            streak, days_since = _consistency_kernel(
+                df['completion'].to_numpy(np.float64))
+            df['streak'] = streak
+            df['days_since_training'] = days_since
+
         return df
     
     def _create_temporal_features(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -4,12 +4,18 @@ Online Learning Loop
 Closed-loop: state → action → feedback → update
 """
 
+import collections
+
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from pathlib import Path
 
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+
 from src.recommendation.hybrid_recommender import HybridRecommender
 from src.recommendation.reward_fn import RewardFunction
 
@@ -19,21 +25,35 @@ class OnlineLearningLoop:
     Online learning loop for continuous model updates.
     """
     
+    # In-memory events kept for get_event_log; older ones spill to Parquet
+    EVENT_LOG_MAXLEN = 10_000
+    SPILL_THRESHOLD = 256
+
     def __init__(self, recommender: Optional[HybridRecommender] = None,
-                 kafka_producer=None):
+                 kafka_producer=None,
+                 spill_dir: str = "data/raw/online_events"):
         """
         Initialize online learning loop.
         
         Args:
             recommender: Hybrid recommender instance
             kafka_producer: Kafka producer for event logging
+            spill_dir: Directory for the Parquet spill of evicted events
         """
         self.recommender = recommender or HybridRecommender()
         self.reward_fn = RewardFunction()
         self.kafka_producer = kafka_producer
         
-        # Event log
-        self.event_log = []
+        # Bounded event log: a ring buffer keeps memory flat and makes
+        # get_event_log O(maxlen) instead of O(full history)
+        self.event_log = collections.deque(maxlen=self.EVENT_LOG_MAXLEN)
+        self.spill_dir = Path(spill_dir)
+        self._spill_buffer = []
+
+        # Kafka events are buffered and sent in batches: one producer
+        # call per event at high rates is dominated by call overhead
+        self._kafka_buffer = []
+        self._flush_threshold = 64
     
     def process_daily_cycle(self, user_id: str, state: Dict) -> Dict:
         """
@@ -63,6 +83,34 @@ class OnlineLearningLoop:
         
         return recommendation
     
+    def process_daily_cycle_batch(self, user_ids: List[str],
+                                  states: List[Dict]) -> List[Dict]:
+        """
+        Process daily cycles for a batch of users in one pass.
+
+        Args:
+            user_ids: User identifiers, aligned with states
+            states: Daily states
+
+        Returns:
+            List of recommendation dictionaries
+        """
+        recommendations = self.recommender.recommend_batch(states)
+
+        timestamp = datetime.now().isoformat()
+        for user_id, state, recommendation in zip(user_ids, states,
+                                                  recommendations):
+            self._log_event({
+                'event_type': 'plan_served',
+                'user_id': user_id,
+                'timestamp': timestamp,
+                'state': state,
+                'action_id': recommendation['action_id'],
+                'recommendation': recommendation,
+            })
+
+        return recommendations
+
     def process_feedback(self, user_id: str, action_id: int, 
                         feedback: Dict) -> float:
         """
@@ -97,19 +145,61 @@ class OnlineLearningLoop:
         return reward
     
     def _log_event(self, event: Dict):
-        """Log event to Kafka and local log."""
+        """Log event to the local log and buffer it for Kafka."""
+        if len(self.event_log) == self.event_log.maxlen:
+            # Ring buffer is full: spill the event about to be evicted
+            self._spill_buffer.append(self.event_log[0])
+            if len(self._spill_buffer) >= self.SPILL_THRESHOLD:
+                self._write_spill()
         self.event_log.append(event)
         
-        # Send to Kafka if available
         if self.kafka_producer:
-            try:
-                import json
-                topic = 'training.user.feedback' if 'feedback' in event['event_type'] else 'training.plan.served'
-                self.kafka_producer.send(topic, value=json.dumps(event))
-            except Exception as e:
-                print(f"Error logging to Kafka: {e}")
+            topic = 'training.user.feedback' if 'feedback' in event['event_type'] else 'training.plan.served'
+            self._kafka_buffer.append((topic, event))
+            if len(self._kafka_buffer) >= self._flush_threshold:
+                self.flush()
     
+    def flush(self):
+        """Drain buffered events to Kafka. Call on shutdown to avoid loss."""
+        if not self.kafka_producer or not self._kafka_buffer:
+            return
+        
+        batch, self._kafka_buffer = self._kafka_buffer, []
+        try:
+            # orjson serializes the dict-heavy payloads several times
+            # faster than stdlib json; default=str covers datetimes
+            for topic, event in batch:
+                self.kafka_producer.send(topic, value=orjson.dumps(event, default=str))
+            self.kafka_producer.flush()
+        except Exception as e:
+            print(f"Error logging to Kafka: {e}")
+    
+    def _write_spill(self):
+        """Append spilled events to the partitioned Parquet sink."""
+        if not self._spill_buffer:
+            return
+        records = []
+        for event in self._spill_buffer:
+            # Nested payloads (state/recommendation/feedback) go in as
+            # JSON strings so the Parquet schema stays flat and stable
+            records.append({
+                key: (orjson.dumps(value, default=str).decode()
+                      if isinstance(value, dict) else value)
+                for key, value in event.items()
+            })
+        self._spill_buffer = []
+
+        df = pd.DataFrame(records)
+        df['month'] = df['timestamp'].str[:7]
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        pq.write_to_dataset(
+            pa.Table.from_pandas(df, preserve_index=False),
+            root_path=str(self.spill_dir),
+            partition_cols=['month'],
+            compression='zstd',
+        )
+
     def get_event_log(self) -> pd.DataFrame:
-        """Get event log as DataFrame."""
-        return pd.DataFrame(self.event_log)
+        """Get the in-memory event log as a DataFrame (bounded size)."""
+        return pd.DataFrame(list(self.event_log))
 
@@ -7,6 +7,13 @@ Defines what training plans the system can recommend.
 from typing import List, Dict
 from dataclasses import dataclass
 
+import numpy as np
+
+# Integer codes for the categorical action attributes. The coded arrays
+# below let safety filtering run as NumPy masks instead of Python loops.
+TYPE_TO_CODE = {"REST": 0, "RECOVERY": 1, "STRENGTH": 2, "CARDIO": 3}
+INTENSITY_TO_CODE = {"NONE": 0, "LOW": 1, "MEDIUM": 2, "HIGH": 3}
+
 
 @dataclass
 class Action:
@@ -24,8 +31,33 @@ class ActionSpace:
     def __init__(self):
         """Initialize action space."""
         self.actions = self._create_action_space()
-        self.action_to_id = {self._action_key(a): a.action_id for a in self.actions}
+        # Tuple keys hash from interned attribute strings plus a small
+        # int - no per-lookup string formatting on the decision path
+        self.action_to_id = {
+            (a.workout_type, a.intensity, a.duration_minutes): a.action_id
+            for a in self.actions
+        }
         self.id_to_action = {a.action_id: a for a in self.actions}
+
+        # Struct-of-arrays view of the space: filtering a couple dozen
+        # actions per recommendation is mask arithmetic, not iteration
+        self._type_codes = np.array(
+            [TYPE_TO_CODE[a.workout_type] for a in self.actions], dtype=np.int8)
+        self._intensity_codes = np.array(
+            [INTENSITY_TO_CODE[a.intensity] for a in self.actions], dtype=np.int8)
+        self._action_ids = np.array(
+            [a.action_id for a in self.actions], dtype=np.int32)
+
+        # Precomputed id arrays per attribute value, so rule filters are
+        # array intersections instead of per-action attribute scans
+        self.by_type = {
+            name: self._action_ids[self._type_codes == code]
+            for name, code in TYPE_TO_CODE.items()
+        }
+        self.by_intensity = {
+            name: self._action_ids[self._intensity_codes == code]
+            for name, code in INTENSITY_TO_CODE.items()
+        }
     
     def _create_action_space(self) -> List[Action]:
         """Create the action space."""
@@ -79,18 +111,13 @@ class ActionSpace:
         
         return actions
     
-    def _action_key(self, action: Action) -> str:
-        """Create unique key for action."""
-        return f"{action.workout_type}_{action.intensity}_{action.duration_minutes}"
-    
     def get_action(self, action_id: int) -> Action:
         """Get action by ID."""
         return self.id_to_action[action_id]
     
     def get_action_id(self, workout_type: str, intensity: str, duration: int) -> int:
         """Get action ID from components."""
-        key = f"{workout_type}_{intensity}_{duration}"
-        return self.action_to_id.get(key, 0)  # Default to REST
+        return self.action_to_id.get((workout_type, intensity, duration), 0)  # Default to REST
     
     def get_all_actions(self) -> List[Action]:
         """Get all actions."""
@@ -112,14 +139,21 @@ class ActionSpace:
         Returns:
             List of allowed action IDs
         """
-        intensity_order = {"NONE": 0, "LOW": 1, "MEDIUM": 2, "HIGH": 3}
-        max_intensity_level = intensity_order.get(max_intensity, 3)
-        
-        allowed = []
-        for action in self.actions:
-            if action.workout_type in allowed_types:
-                if intensity_order.get(action.intensity, 0) <= max_intensity_level:
-                    allowed.append(action.action_id)
-        
-        return allowed
+        max_intensity_level = INTENSITY_TO_CODE.get(max_intensity, 3)
+        allowed_codes = np.fromiter(
+            (TYPE_TO_CODE[t] for t in allowed_types if t in TYPE_TO_CODE),
+            dtype=np.int8)
+
+        mask = (np.isin(self._type_codes, allowed_codes)
+                & (self._intensity_codes <= max_intensity_level))
+        return self._action_ids[mask].tolist()
+
+
+# The action space is static, so one shared instance serves every caller;
+# building it per recommendation re-allocated the dataclasses and dicts
+_DEFAULT_SPACE = ActionSpace()
+
 
+def get_default_action_space() -> ActionSpace:
+    """Return the shared ActionSpace instance."""
+    return _DEFAULT_SPACE
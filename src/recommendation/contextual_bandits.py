@@ -8,8 +8,9 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional
 from scipy import stats
+from scipy.linalg import solve_triangular
 
-from .action_space import ActionSpace, Action
+from .action_space import ActionSpace, Action, get_default_action_space
 from .reward_fn import RewardFunction
 
 
@@ -40,6 +41,13 @@ class ContextualBandit:
         # Track statistics
         self.action_counts = np.zeros(action_space.get_action_count())
         self.total_rewards = np.zeros(action_space.get_action_count())
+
+        # Reused when no safety filter restricts the arms
+        self._all_actions = np.arange(action_space.get_action_count())
+
+        # Per-instance PCG64 generator: faster than the legacy global
+        # RNG and no shared lock between concurrent requests
+        self._rng = np.random.default_rng()
     
     def select_action(self, context: np.ndarray, 
                      allowed_actions: Optional[List[int]] = None) -> int:
@@ -53,21 +61,41 @@ class ContextualBandit:
         Returns:
             Selected action ID
         """
-        if allowed_actions is None:
-            allowed_actions = list(range(self.action_space.get_action_count()))
-        
-        # Sample from Beta distribution for each action
-        sampled_rewards = []
-        for action_id in allowed_actions:
-            # Sample from Beta(alpha, beta)
-            sample = np.random.beta(self.alpha[action_id], self.beta[action_id])
-            sampled_rewards.append((action_id, sample))
-        
-        # Select action with highest sampled reward
-        best_action = max(sampled_rewards, key=lambda x: x[1])[0]
-        
-        return best_action
+        idx = (self._all_actions if allowed_actions is None
+               else np.asarray(allowed_actions))
+
+        # One vectorized Beta draw across all allowed arms instead of a
+        # scalar RNG call per arm
+        samples = self._rng.beta(self.alpha[idx], self.beta[idx])
+
+        return int(idx[samples.argmax()])
     
+    def select_action_batch(self, contexts: np.ndarray,
+                            allowed_masks: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Select actions for a batch of users in one vectorized draw.
+
+        The Beta posteriors are shared across users, so a (B, K) draw
+        plus a row-wise argmax decides every user at once instead of B
+        separate select_action calls.
+
+        Args:
+            contexts: (B, d) context matrix (unused by Beta-Bernoulli,
+                kept for API parity with select_action)
+            allowed_masks: (B, K) boolean mask of permitted actions per
+                user; None allows everything
+
+        Returns:
+            Array of B selected action IDs
+        """
+        batch_size = len(contexts)
+        shape = (batch_size, len(self.alpha))
+        samples = self._rng.beta(np.broadcast_to(self.alpha, shape),
+                                 np.broadcast_to(self.beta, shape))
+        if allowed_masks is not None:
+            samples = np.where(allowed_masks, samples, -np.inf)
+        return samples.argmax(axis=1)
+
     def update(self, action_id: int, reward: float):
         """
         Update bandit parameters after observing reward.
@@ -89,34 +117,40 @@ class ContextualBandit:
         self.total_rewards[action_id] += reward
     
     def get_action_probabilities(self, context: np.ndarray,
-                                allowed_actions: Optional[List[int]] = None) -> Dict[int, float]:
+                                allowed_actions: Optional[List[int]] = None,
+                                as_array: bool = False):
         """
         Get action selection probabilities.
         
         Args:
             context: Context features
             allowed_actions: List of allowed action IDs
+            as_array: Return (action_ids, probabilities) arrays and skip
+                the dict construction - for hot paths that consume the
+                probabilities numerically
         
         Returns:
-            Dictionary mapping action_id to probability
+            Dictionary mapping action_id to probability, or the two
+            arrays when as_array is True
         """
-        if allowed_actions is None:
-            allowed_actions = list(range(self.action_space.get_action_count()))
-        
-        # Expected reward for each action (mean of Beta distribution)
-        expected_rewards = {}
-        for action_id in allowed_actions:
-            expected = self.alpha[action_id] / (self.alpha[action_id] + self.beta[action_id])
-            expected_rewards[action_id] = expected
-        
+        idx = (self._all_actions if allowed_actions is None
+               else np.asarray(allowed_actions))
+
+        # Expected reward per arm (mean of Beta), computed in one shot
+        expected = self.alpha[idx] / (self.alpha[idx] + self.beta[idx])
+
         # Normalize to probabilities
-        total = sum(expected_rewards.values())
+        total = expected.sum()
         if total > 0:
-            probabilities = {k: v / total for k, v in expected_rewards.items()}
+            probs = expected / total
         else:
-            probabilities = {k: 1.0 / len(allowed_actions) for k in allowed_actions}
-        
-        return probabilities
+            probs = np.full(len(idx), 1.0 / len(idx))
+
+        if as_array:
+            return idx, probs
+        # tolist converts to native int/float in C, cheaper than boxing
+        # each element inside a comprehension
+        return dict(zip(idx.tolist(), probs.tolist()))
     
     def get_statistics(self) -> Dict:
         """Get bandit statistics."""
@@ -129,6 +163,27 @@ class ContextualBandit:
             }
         }
 
+    def __getstate__(self):
+        # Pickle only the posterior and statistics arrays; the action
+        # space and reward function are static and rebuilt on load, which
+        # keeps the model file small and fast to open at serving startup
+        return {
+            'alpha': self.alpha,
+            'beta': self.beta,
+            'action_counts': self.action_counts,
+            'total_rewards': self.total_rewards,
+        }
+
+    def __setstate__(self, state):
+        self.alpha = state['alpha']
+        self.beta = state['beta']
+        self.action_counts = state['action_counts']
+        self.total_rewards = state['total_rewards']
+        self.action_space = get_default_action_space()
+        self.reward_fn = RewardFunction()
+        self._all_actions = np.arange(self.action_space.get_action_count())
+        self._rng = np.random.default_rng()
+
 
 class LinearContextualBandit:
     """
@@ -137,6 +192,10 @@ class LinearContextualBandit:
     Uses linear model for continuous rewards.
     More advanced than Beta-Bernoulli.
     """
+
+    # Rank-1 Sherman-Morrison updates accumulate float error, so B_inv is
+    # rebuilt from B after this many updates to an arm
+    RESYNC_EVERY = 64
     
     def __init__(self, action_space: ActionSpace, 
                  feature_dim: int,
@@ -156,8 +215,10 @@ class LinearContextualBandit:
         
         # Linear model parameters for each action
         # Prior: N(0, I)
+        eye = np.eye(feature_dim)
         self.theta = np.zeros((self.num_actions, feature_dim))
-        self.B = np.array([np.eye(feature_dim) for _ in range(self.num_actions)])
+        self.B = np.empty((self.num_actions, feature_dim, feature_dim))
+        self.B[:] = eye
         self.f = np.zeros((self.num_actions, feature_dim))
         
         # Noise variance
@@ -165,6 +226,20 @@ class LinearContextualBandit:
         
         # Statistics
         self.action_counts = np.zeros(self.num_actions)
+
+        # B⁻¹ maintained directly by Sherman-Morrison rank-1 updates, so
+        # posterior means never need a dense solve. _cov_factor stacks
+        # the Cholesky factors of B⁻¹ for the batched posterior draws and
+        # is refreshed lazily per arm. With the identity prior the
+        # initial state (B⁻¹ = I, factor = I, theta_hat = 0) is exact.
+        self.B_inv = np.empty((self.num_actions, feature_dim, feature_dim))
+        self.B_inv[:] = eye
+        self._cov_factor = self.B_inv.copy()
+        self._theta_hat = np.zeros((self.num_actions, feature_dim))
+        self._dirty = np.zeros(self.num_actions, dtype=bool)
+        self._updates_since_resync = np.zeros(self.num_actions, dtype=np.int64)
+        self._all_actions = np.arange(self.num_actions)
+        self._rng = np.random.default_rng()
     
     def select_action(self, context: np.ndarray,
                      allowed_actions: Optional[List[int]] = None) -> int:
@@ -178,27 +253,22 @@ class LinearContextualBandit:
         Returns:
             Selected action ID
         """
-        if allowed_actions is None:
-            allowed_actions = list(range(self.num_actions))
-        
-        # Sample from posterior for each action
-        sampled_rewards = []
-        for action_id in allowed_actions:
-            # Posterior mean
-            theta_hat = np.linalg.solve(self.B[action_id], self.f[action_id])
-            
-            # Sample from posterior
-            B_inv = np.linalg.inv(self.B[action_id])
-            theta_sample = np.random.multivariate_normal(theta_hat, self.sigma**2 * B_inv)
-            
-            # Expected reward
-            expected_reward = np.dot(theta_sample, context)
-            sampled_rewards.append((action_id, expected_reward))
-        
-        # Select action with highest sampled reward
-        best_action = max(sampled_rewards, key=lambda x: x[1])[0]
-        
-        return best_action
+        idx = (self._all_actions if allowed_actions is None
+               else np.asarray(allowed_actions))
+
+        for action_id in idx:
+            self._refresh_posterior(action_id)
+
+        # Batched posterior draw: with C Cᵀ = B⁻¹, a sample with
+        # covariance σ²B⁻¹ is θ̂ + σ·Cz, z ~ N(0, I), and with the
+        # factors stacked the draws for every allowed arm collapse into
+        # one einsum plus one matvec for the expected rewards.
+        Z = self._rng.standard_normal((len(idx), self.feature_dim))
+        theta_samples = (self._theta_hat[idx]
+                         + self.sigma * np.einsum('kij,kj->ki', self._cov_factor[idx], Z))
+        expected_rewards = theta_samples @ context
+
+        return int(idx[expected_rewards.argmax()])
     
     def update(self, action_id: int, context: np.ndarray, reward: float):
         """
@@ -212,12 +282,36 @@ class LinearContextualBandit:
         # Update B and f (Bayesian linear regression update)
         self.B[action_id] += np.outer(context, context)
         self.f[action_id] += reward * context
+
+        # Sherman-Morrison keeps B⁻¹ exact under the rank-1 update in
+        # O(d²), so the posterior mean refreshes without a dense solve;
+        # periodically rebuild B⁻¹ from B to wash out rounding drift
+        self._updates_since_resync[action_id] += 1
+        if self._updates_since_resync[action_id] >= self.RESYNC_EVERY:
+            L = np.linalg.cholesky(self.B[action_id])
+            Linv = solve_triangular(L, np.eye(self.feature_dim), lower=True)
+            self.B_inv[action_id] = Linv.T @ Linv
+            self._updates_since_resync[action_id] = 0
+        else:
+            v = self.B_inv[action_id] @ context
+            self.B_inv[action_id] -= np.outer(v, v) / (1.0 + context @ v)
+        self._theta_hat[action_id] = self.B_inv[action_id] @ self.f[action_id]
+        self._dirty[action_id] = True
         
         # Update statistics
         self.action_counts[action_id] += 1
     
+    def _refresh_posterior(self, action_id: int):
+        """Refresh one arm's sampling factor if its posterior changed.
+
+        The mean is maintained incrementally in update; only the
+        covariance factor needs refactorizing, straight from B⁻¹.
+        """
+        if self._dirty[action_id]:
+            self._cov_factor[action_id] = np.linalg.cholesky(self.B_inv[action_id])
+            self._dirty[action_id] = False
+
     def get_expected_reward(self, action_id: int, context: np.ndarray) -> float:
         """Get expected reward for an action."""
-        theta_hat = np.linalg.solve(self.B[action_id], self.f[action_id])
-        return np.dot(theta_hat, context)
+        return np.dot(self._theta_hat[action_id], context)
 
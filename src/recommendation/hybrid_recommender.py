@@ -7,7 +7,7 @@ Combines rule-based heuristics with contextual bandits.
 import numpy as np
 from typing import Dict, List, Optional
 
-from .action_space import ActionSpace, Action
+from .action_space import Action, get_default_action_space
 from .contextual_bandits import ContextualBandit
 from .reward_fn import RewardFunction
 from src.safety.safety_gate import SafetyGate
@@ -29,7 +29,7 @@ class HybridRecommender:
         Args:
             use_rl: Whether to use RL (bandits) or just rules
         """
-        self.action_space = ActionSpace()
+        self.action_space = get_default_action_space()
         self.reward_fn = RewardFunction()
         self.safety_gate = SafetyGate()
         
@@ -54,9 +54,9 @@ class HybridRecommender:
         # Safety check
         safety_result = self.safety_gate.check_state(state)
         
-        # Get allowed actions
+        # Get allowed actions from the same safety evaluation
         all_action_ids = list(range(self.action_space.get_action_count()))
-        allowed_actions = self.safety_gate.filter_actions(state, all_action_ids)
+        allowed_actions = self.safety_gate.filter_actions(safety_result, all_action_ids)
         
         if not allowed_actions:
             allowed_actions = [0]  # Default to REST
@@ -70,6 +70,48 @@ class HybridRecommender:
             # Use rule-based
             action_id = self._rule_based_recommendation(state, allowed_actions)
         
+        return self._build_recommendation(state, action_id, safety_result)
+
+    def recommend_batch(self, states: List[Dict]) -> List[Dict]:
+        """
+        Recommend training plans for a batch of states.
+
+        Safety checks stay per state, but when the bandit is active the
+        Thompson draws for the whole batch collapse into one vectorized
+        call - the per-decision Python overhead is paid once per batch.
+
+        Args:
+            states: List of daily state dictionaries
+
+        Returns:
+            List of recommendation dictionaries, one per state
+        """
+        num_actions = self.action_space.get_action_count()
+        all_action_ids = list(range(num_actions))
+
+        safety_results = [self.safety_gate.check_state(s) for s in states]
+        allowed_lists = [self.safety_gate.filter_actions(result, all_action_ids) or [0]
+                         for result in safety_results]
+
+        if self.bandit:
+            masks = np.zeros((len(states), num_actions), dtype=bool)
+            for i, allowed in enumerate(allowed_lists):
+                masks[i, allowed] = True
+            contexts = np.stack([self._state_to_context(s) for s in states])
+            action_ids = self.bandit.select_action_batch(contexts, masks)
+        else:
+            action_ids = [self._rule_based_recommendation(s, allowed)
+                          for s, allowed in zip(states, allowed_lists)]
+
+        return [
+            self._build_recommendation(state, int(action_id), safety_result)
+            for state, action_id, safety_result
+            in zip(states, action_ids, safety_results)
+        ]
+
+    def _build_recommendation(self, state: Dict, action_id: int,
+                              safety_result) -> Dict:
+        """Assemble the response dictionary for one decision."""
         action = self.action_space.get_action(action_id)
         
         return {
@@ -112,27 +154,33 @@ class HybridRecommender:
         if readiness < 40 or sleep_hours < 5:
             return 0  # REST
         
+        # Rules below intersect the allowed ids with the precomputed
+        # per-attribute id arrays - no per-action attribute lookups.
+        # Both sides are unique and sorted, so assume_unique holds.
+        allowed = np.asarray(allowed_actions)
+        space = self.action_space
+
         # Rule 2: High fatigue → RECOVERY
         if fatigue >= 7:
-            recovery_actions = [a for a in allowed_actions 
-                              if self.action_space.get_action(a).workout_type == "RECOVERY"]
-            if recovery_actions:
-                return recovery_actions[0]
+            recovery_actions = np.intersect1d(
+                allowed, space.by_type["RECOVERY"], assume_unique=True)
+            if recovery_actions.size:
+                return int(recovery_actions[0])
         
         # Rule 3: Long rest → Medium intensity
         if days_since >= 3:
-            medium_actions = [a for a in allowed_actions
-                            if self.action_space.get_action(a).intensity == "MEDIUM"]
-            if medium_actions:
-                return medium_actions[0]
+            medium_actions = np.intersect1d(
+                allowed, space.by_intensity["MEDIUM"], assume_unique=True)
+            if medium_actions.size:
+                return int(medium_actions[0])
         
         # Default: Low intensity
-        low_actions = [a for a in allowed_actions
-                      if self.action_space.get_action(a).intensity == "LOW"]
-        if low_actions:
-            return low_actions[0]
+        low_actions = np.intersect1d(
+            allowed, space.by_intensity["LOW"], assume_unique=True)
+        if low_actions.size:
+            return int(low_actions[0])
         
-        return allowed_actions[0]
+        return int(allowed[0])
     
     def _generate_rationale(self, state: Dict, action: Action) -> str:
         """Generate explanation for recommendation."""
@@ -151,3 +199,14 @@ class HybridRecommender:
         if self.bandit:
             self.bandit.update(action_id, reward)
 
+    def __getstate__(self):
+        # Only the bandit carries learned state; the action space, reward
+        # function, and safety gate are deterministic and rebuilt on load
+        return {'bandit': self.bandit}
+
+    def __setstate__(self, state):
+        self.bandit = state['bandit']
+        self.action_space = get_default_action_space()
+        self.reward_fn = RewardFunction()
+        self.safety_gate = SafetyGate()
+
@@ -12,7 +12,7 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from src.recommendation.hybrid_recommender import HybridRecommender
-from src.recommendation.action_space import ActionSpace
+from src.recommendation.action_space import get_default_action_space
 from src.feature_store.feature_engineering import FeatureEngineer
 
 
@@ -41,7 +41,7 @@ def train_model(features_path: str = "data/features/daily_features.parquet",
     
     # Initialize recommender
     recommender = HybridRecommender(use_rl=True)
-    action_space = ActionSpace()
+    action_space = get_default_action_space()
     
     # Simulate training (in production, use real feedback)
     print("\n" + "=" * 70)
@@ -51,20 +51,30 @@ def train_model(features_path: str = "data/features/daily_features.parquet",
     # For MVP: simulate based on rules
     # In production, use actual user feedback
     training_episodes = min(100, len(features_df))
-    
+
+    # Pull the state columns out as NumPy arrays once: per-row iloc +
+    # to_dict rebuilds a Series and a full-width dict per episode
+    state_cols = ['readiness_score', 'sleep_score', 'activity_score', 'hrv',
+                  'resting_hr', 'fatigue', 'days_since_training',
+                  'sleep_duration_hours']
+    arrs = {c: features_df[c].to_numpy() for c in state_cols
+            if c in features_df.columns}
+
+    # Simulated feedback, drawn up front. Rule: higher readiness →
+    # higher completion probability
+    readiness = arrs.get('readiness_score',
+                         np.full(len(features_df), 50.0))
+    completion_probs = readiness / 100.0
+    rands = np.random.default_rng().random(training_episodes)
+
     for idx in range(training_episodes):
-        state = features_df.iloc[idx].to_dict()
+        state = {c: arr[idx] for c, arr in arrs.items()}
         
         # Get recommendation
         recommendation = recommender.recommend(state)
         action_id = recommendation['action_id']
         
-        # Simulate feedback (in production, use real feedback)
-        # Rule: higher readiness → higher completion probability
-        readiness = state.get('readiness_score', 50)
-        completion_prob = readiness / 100.0
-        
-        completion = 1 if np.random.random() < completion_prob else 0
+        completion = int(rands[idx] < completion_probs[idx])
         reward = completion  # Binary reward for MVP
         
         # Update model
@@ -8,6 +8,8 @@ from typing import Dict, List, Optional
 from dataclasses import dataclass
 
 from src.agent.safety import SafetyGuardrails, SafetyCheckResult
+from src.agent.state import DailyState
+from src.recommendation.action_space import get_default_action_space
 
 
 @dataclass
@@ -31,6 +33,7 @@ class SafetyGate:
         """Initialize safety gate."""
         self.rules = self._create_safety_rules()
         self.safety_guardrails = SafetyGuardrails()
+        self._action_space = get_default_action_space()
     
     def _create_safety_rules(self) -> List[SafetyRule]:
         """Create safety rules."""
@@ -76,8 +79,6 @@ class SafetyGate:
             SafetyCheckResult
         """
         # Use existing safety guardrails
-        from src.agent.state import DailyState
-        
         daily_state = DailyState(
             user_id=state.get('user_id', 'unknown'),
             date=state.get('date', ''),
@@ -93,42 +94,37 @@ class SafetyGate:
         
         return self.safety_guardrails.check_state(daily_state)
     
-    def filter_actions(self, state: Dict, 
+    def filter_actions(self, safety_result: SafetyCheckResult,
                       all_action_ids: List[int]) -> List[int]:
         """
-        Filter actions based on safety rules.
+        Filter actions based on an already-computed safety check.
+
+        Callers run check_state once and pass the result in, so each
+        recommendation evaluates the guardrails a single time.
         
         Args:
-            state: Daily state
+            safety_result: Result from check_state for this state
             all_action_ids: All possible action IDs
         
         Returns:
             List of safe action IDs
         """
-        safety_result = self.check_state(state)
-        
         if not safety_result.is_safe:
             # Get max intensity and allowed types from safety result
             if safety_result.recommended_action == 'mandatory_rest_day':
                 # Only allow REST
-                from .action_space import ActionSpace
-                action_space = ActionSpace()
                 return [0]  # REST action ID
             
             elif safety_result.recommended_action == 'rest_day_or_light_activity':
                 # Allow REST and RECOVERY only
-                from .action_space import ActionSpace
-                action_space = ActionSpace()
-                return action_space.filter_by_safety(
+                return self._action_space.filter_by_safety(
                     allowed_types=["REST", "RECOVERY"],
                     max_intensity="LOW"
                 )
             
             elif safety_result.recommended_action == 'reduce_intensity':
                 # Reduce max intensity
-                from .action_space import ActionSpace
-                action_space = ActionSpace()
-                return action_space.filter_by_safety(
+                return self._action_space.filter_by_safety(
                     allowed_types=["REST", "RECOVERY", "STRENGTH", "CARDIO"],
                     max_intensity="MEDIUM"
                 )
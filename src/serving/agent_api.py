@@ -47,7 +47,7 @@ async def chat_with_agent(request: ChatRequest):
         Agent response with message, plan, and tool calls
     """
     try:
-        response = agent.process_daily_coaching(
+        response = await agent.process_daily_coaching(
             user_id=request.user_id,
             user_message=request.message
         )
@@ -74,7 +74,7 @@ async def get_daily_plan(user_id: str):
         Daily plan and coaching message
     """
     try:
-        response = agent.process_daily_coaching(user_id=user_id)
+        response = await agent.process_daily_coaching(user_id=user_id)
         
         return {
             'plan': response.get('plan'),
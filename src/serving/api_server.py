@@ -6,7 +6,7 @@ Serves recommendations and handles user interactions.
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 import sys
 import logging
 from pathlib import Path
@@ -42,6 +42,11 @@ class RecommendationRequest(BaseModel):
     state: Dict
 
 
+class BatchRecommendationRequest(BaseModel):
+    """Request for recommendations for several users at once."""
+    requests: List[RecommendationRequest]
+
+
 class FeedbackRequest(BaseModel):
     """Feedback request."""
     user_id: str
@@ -72,6 +77,32 @@ async def get_recommendation(request: RecommendationRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/recommend_batch")
+async def get_recommendations_batch(request: BatchRecommendationRequest):
+    """
+    Get training plan recommendations for a batch of users.
+
+    Thompson sampling is vectorized across the batch, so the per-user
+    decision overhead is paid once per request instead of once per user.
+
+    Args:
+        request: List of user IDs and states
+
+    Returns:
+        List of recommended training plans, in request order
+    """
+    try:
+        logger.info(f"Batch recommendation request for {len(request.requests)} users")
+        recommendations = learning_loop.process_daily_cycle_batch(
+            [r.user_id for r in request.requests],
+            [r.state for r in request.requests],
+        )
+        return {"recommendations": recommendations}
+    except Exception as e:
+        logger.error(f"Batch recommendation error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/feedback")
 async def submit_feedback(request: FeedbackRequest):
     """